@@ -2,14 +2,24 @@ import os
 from pathlib import Path
 
 # Base paths
-BASE_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+BASE_DIR = Path(__file__).resolve().parent
 STORAGE_DIR = BASE_DIR / "storage"
 TEMP_DIR = STORAGE_DIR / "temp"
 UPLOADS_DIR = STORAGE_DIR / "uploads"
 
-# Ensure directories exist
-for directory in [STORAGE_DIR, TEMP_DIR, UPLOADS_DIR]:
-    directory.mkdir(exist_ok=True, parents=True)
+_dirs_ensured = False
+
+
+def ensure_dirs():
+    """Create the storage directories, called lazily by the modules that write to them."""
+    global _dirs_ensured
+    if _dirs_ensured:
+        return
+    for directory in (STORAGE_DIR, TEMP_DIR, UPLOADS_DIR):
+        if not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+    _dirs_ensured = True
+
 
 # Database configuration
 DB_PATH = str(STORAGE_DIR / "video_data.db")
@@ -18,10 +28,36 @@ DB_PATH = str(STORAGE_DIR / "video_data.db")
 WHISPER_MODEL = "base"  # Options: tiny, base, small, medium, large
 
 # vLLM configuration
-VLLM_MODEL = "Qwen/Qwen3-30B-A3B"  # Choose your preferred model
+VLLM_MODE = "http"  # "http": separate `vllm serve` process, "embedded": in-process engine
+VLLM_MODEL = "Qwen/Qwen3-30B-A3B-GPTQ-Int4"  # Choose your preferred model
+# Weight quantization of VLLM_MODEL, must match the checkpoint.
+# Options: None (unquantized, e.g. "Qwen/Qwen3-30B-A3B"), awq, awq_marlin, gptq, gptq_marlin
+VLLM_QUANTIZATION = "gptq_marlin"
 VLLM_PORT = 3000
 VLLM_HOST = "0.0.0.0"
 VLLM_MAX_MODEL_LEN = 4096
+VLLM_GPU_MEMORY_UTILIZATION = 0.90
+VLLM_MAX_NUM_BATCHED_TOKENS = 8192
+VLLM_MAX_NUM_SEQS = 64
+VLLM_KV_CACHE_DTYPE = "fp8"  # Options: auto, fp8 (only used on GPUs with compute capability >= 8.9)
+VLLM_SWAP_SPACE = 4  # CPU swap space per GPU in GiB
+VLLM_LOG_PATH = os.path.expanduser("~/.cache/vllm/server.log")  # Server stdout and stderr
+# Coalesce concurrent generate() calls into batched requests. Off by default: each call then
+# waits up to VLLM_MICRO_BATCH_WAIT_MS for company, which only pays off under concurrent load
+VLLM_MICRO_BATCH = False
+VLLM_MICRO_BATCH_SIZE = 16  # Maximum prompts per coalesced request
+VLLM_MICRO_BATCH_WAIT_MS = 10  # How long to wait for more prompts before sending
 
 # Vector store configuration
 VECTOR_DB_PATH = str(STORAGE_DIR / "vector_store")
+
+# Cache configuration
+CACHE_EXPIRY = 60 * 60  # Seconds before a cached result expires
+CACHE_FAILURE_TTL = 30  # Seconds a failed result is cached before it is retried
+CACHE_DIR = os.path.expanduser("~/.cache/video_analyzer/qa")  # Persistent result cache
+
+# Semantic cache configuration
+SEMANTIC_CACHE_THRESHOLD = 0.95  # Minimum cosine similarity for a cache hit
+SEMANTIC_CACHE_TTL = 60 * 60 * 24  # Seconds before a cached completion expires
+SEMANTIC_CACHE_PATH = str(STORAGE_DIR / "semantic_cache")  # Persisted HNSW indexes
+SEMANTIC_CACHE_MAX_ELEMENTS = 100_000  # Per video and task
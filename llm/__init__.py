@@ -1,3 +1,4 @@
 from .vllm_setup import VLLMServer
+from .vllm_engine import VLLMEngine, create_llm
 from .context_manager import ContextManager
 from .langchain_interface import LangchainInterface
@@ -1,54 +1,196 @@
+import io
 import logging
-from ..storage import VideoDatabase, VideoVectorStore
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from cachetools import LRUCache, TTLCache
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from ..storage import Transcript, VideoDatabase, VideoVectorStore
 
 logger = logging.getLogger(__name__)
 
 
+# Prompts start with the transcript text and end with the task, so every prompt about the
+# same video (summary, quiz, repeated questions) shares a byte-identical prefix that
+# vLLM's prefix cache can reuse. Only the trailing task differs between them.
+_TASK_SEPARATOR = "\n\n### Task: "
+
+_QA_CONTEXT_HEADER = "Here are relevant parts of the video transcript:"
+
+_QA_TASK = (
+    "Based on the transcript segments above, provide a clear, concise answer to the user's question. "
+    "Reference specific timestamps when appropriate using the [MM:SS] format. "
+    "If the provided segments don't contain enough information to answer the question fully, "
+    "acknowledge this limitation in your response."
+)
+
+_NAVIGATION_CONTEXT_HEADER = (
+    "Your task is to identify the timestamp in the video that best matches the user's "
+    "navigation request.\n\n"
+    "Respond with the following format:"
+    "\n1. The exact timestamp (in the format MM:SS or HH:MM:SS) that best matches the user's request"
+    "\n2. A brief explanation (1-2 sentences) of why this is the right part of the video"
+    "\n3. If you're uncertain about the exact timestamp, state your confidence level and suggest an alternative approach\n\n"
+    "Here are some relevant parts of the transcript:"
+)
+
+_TRANSCRIPT_HEADER = "Transcript:\n\n"
+
+_SUMMARY_TASK = (
+    "Create a comprehensive summary of the video transcript above.\n\n"
+    "Please structure your summary as follows:\n"
+    "1. A brief overview (2-3 sentences) describing the main topic\n"
+    "2. 3-5 key points or main ideas covered in the video\n"
+    "3. A concise conclusion\n\n"
+    "Keep the entire summary under 250 words while capturing the essential content and flow of the video."
+)
+
+_QUIZ_TASK = "\n\n".join(
+    [
+        "Create a quiz based on the video transcript above.",
+        "\nGenerate a balanced quiz with these specifications:",
+        "- 5 questions of mixed difficulty (2 easy, 2 medium, 1 challenging)",
+        "- Questions should cover different parts of the video, not just the beginning",
+        "- Include a mix of factual recall and conceptual understanding questions",
+        "- For each question, provide 4 plausible answer options with exactly one correct answer",
+        "- Make incorrect options realistic and plausible to test true understanding",
+        "\nFormat the output as a JSON array of objects with these fields:",
+        "- question: The quiz question text",
+        "- options: Array of 4 possible answers",
+        "- correctAnswerIndex: Index (0-3) of the correct answer",
+        "- difficulty: String indicating difficulty level ('easy', 'medium', or 'challenging')",
+    ]
+)
+
+
+# Rough token estimate for English text, avoids loading a tokenizer
+_CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=8192)
+def _format_timestamp(seconds: int) -> str:
+    """Convert whole seconds to MM:SS format."""
+    minutes, seconds = divmod(seconds, 60)
+    return f"{minutes}:{seconds:02d}"
+
+
 class ContextManager:
     """Manages context preparation for LLM queries."""
 
     def __init__(self, db: VideoDatabase, vector_store: VideoVectorStore):
         self.db = db
         self.vector_store = vector_store
+        self._search_cache = TTLCache(maxsize=512, ttl=300)
+        self._search_lock = threading.Lock()
+        # video_id -> (transcript version, Transcript)
+        self._transcript_cache = LRUCache(maxsize=32)
+        # video_id -> (transcript version, fully formatted prompt)
+        self._summary_prompt_cache = LRUCache(maxsize=32)
+        self._quiz_prompt_cache = LRUCache(maxsize=32)
+        # video_id -> (transcript version, condensed transcript shared by summary and quiz)
+        self._condensed_cache = LRUCache(maxsize=32)
+        # Guards all of the per-video caches above
+        self._transcript_lock = threading.Lock()
+        # Transcript reads and vector searches are independent round-trips, overlap them
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="context")
+
+    def _cache_get(self, cache: LRUCache, video_id: str, version: int) -> Optional[Any]:
+        """Get a per-video cached value if it was built from transcript ``version``."""
+        with self._transcript_lock:
+            cached = cache.get(video_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        return None
+
+    def _cache_set(self, cache: LRUCache, video_id: str, version: int, value: Any) -> None:
+        """Cache a per-video value built from transcript ``version``."""
+        with self._transcript_lock:
+            cache[video_id] = (version, value)
+
+    def _get_transcript(self, video_id: str, version: Optional[int] = None) -> Transcript:
+        """Get a video transcript, reusing the parsed arrays until it is re-ingested."""
+        if version is None:
+            version = self.db.get_transcript_version(video_id)
+        transcript = self._cache_get(self._transcript_cache, video_id, version)
+        if transcript is not None:
+            return transcript
+
+        transcript = self.db.get_transcript_arrays(video_id)
+        if len(transcript):
+            self._cache_set(self._transcript_cache, video_id, version, transcript)
+        return transcript
+
+    def get_transcript(self, video_id: str) -> Transcript:
+        """Get the cached struct-of-arrays transcript of a video."""
+        return self._get_transcript(video_id)
+
+    def preload(self, video_id: str) -> int:
+        """Load and cache a video's transcript ahead of its first query.
+
+        Returns:
+            Number of transcript segments
+        """
+        return len(self._get_transcript(video_id))
+
+    def _search(self, query: str, video_id: str, k: int, version: int) -> List[Dict]:
+        """Search the vector store, reusing results for repeated queries."""
+        # Keyed by transcript version so results from before a re-ingest aren't reused
+        key = (" ".join(query.lower().split()), video_id, k, version)
+        with self._search_lock:
+            results = self._search_cache.get(key)
+        if results is not None:
+            return results
+
+        results = self.vector_store.search(query=query, video_id=video_id, k=k)
+        if results:
+            with self._search_lock:
+                self._search_cache[key] = results
+        return results
+
+    @staticmethod
+    def _format_segments(header: str, texts: Sequence[str], starts: Sequence[float]) -> str:
+        """Append timestamped segments, in chronological order, to a static header."""
+        buf = io.StringIO()
+        buf.write(header)
+        for index in np.argsort(starts, kind="stable"):
+            buf.write(f"\n\n[{_format_timestamp(int(starts[index]))}] ")
+            buf.write(texts[index].strip())
+        return buf.getvalue()
+
+    def _format_search_results(self, header: str, results: List[Dict]) -> str:
+        """Format vector store search results under a static header."""
+        return self._format_segments(
+            header,
+            [result["text"] for result in results],
+            np.array([result["start_time"] for result in results], dtype=np.float32),
+        )
 
     def prepare_context(self, query: str, video_id: str, context_size: int = 5) -> str:
         """Prepare context for a query about a specific video."""
         try:
-            relevant_segments = self.vector_store.search(
-                query=query, video_id=video_id, k=context_size
-            )
+            # Prefetch the transcript in case the vector search comes back empty
+            version = self.db.get_transcript_version(video_id)
+            transcript_future = self._executor.submit(self._get_transcript, video_id, version)
+            relevant_segments = self._search(query, video_id, context_size, version)
 
             if not relevant_segments:
-                full_transcript, segments = self.db.get_transcript(video_id)
-                if not segments:
+                transcript = transcript_future.result()
+                if not len(transcript):
                     return "No transcript available for this video."
 
-                relevant_segments = [
-                    {
-                        "text": segment["text"],
-                        "start_time": segment["start"],
-                        "end_time": segment["end"],
-                    }
-                    for segment in segments[:context_size]
-                ]
-
-            context_parts = [
-                "Here are relevant parts of the video transcript that address the user's question:",
-                f"User question: \"{query}\"\n",
-            ]
-
-            for i, segment in enumerate(relevant_segments):
-                timestamp = self._format_timestamp(segment["start_time"])
-                context_parts.append(f"[{timestamp}] {segment['text']}")
-
-            context_parts.append(
-                "\nBased on these transcript segments, please provide a clear, concise answer to the user's question. "
-                "Reference specific timestamps when appropriate using the [MM:SS] format. "
-                "If the provided segments don't contain enough information to answer the question fully, "
-                "acknowledge this limitation in your response."
-            )
+                segments = self._format_segments(
+                    _QA_CONTEXT_HEADER,
+                    transcript.texts[:context_size],
+                    transcript.starts[:context_size],
+                )
+            else:
+                segments = self._format_search_results(_QA_CONTEXT_HEADER, relevant_segments)
 
-            return "\n\n".join(context_parts)
+            return segments + _TASK_SEPARATOR + _QA_TASK
 
         except Exception as e:
             logger.error(f"Error preparing context: {str(e)}")
@@ -56,74 +198,92 @@ class ContextManager:
 
     def prepare_navigation_context(self, query: str, video_id: str) -> str:
         """Prepare context specifically for navigation queries."""
-        full_transcript, segments = self.db.get_transcript(video_id)
-        if not segments:
+        version = self.db.get_transcript_version(video_id)
+        transcript_future = self._executor.submit(self._get_transcript, video_id, version)
+        search_future = self._executor.submit(self._search, query, video_id, 3, version)
+
+        if not len(transcript_future.result()):
             return "No transcript available for this video."
 
-        relevant_segments = self.vector_store.search(query=query, video_id=video_id, k=3)
+        relevant_segments = search_future.result()
 
-        context_parts = [
-            "The user wants to navigate to a specific part of the video with this request:",
-            f"\"{query}\"",
-            "\nYour task is to identify the most relevant timestamp based on their request.",
-            "Here are some relevant parts of the transcript:",
-        ]
+        return self._format_search_results(_NAVIGATION_CONTEXT_HEADER, relevant_segments)
 
-        for segment in relevant_segments:
-            timestamp = self._format_timestamp(segment["start_time"])
-            context_parts.append(f"[{timestamp}] {segment['text']}")
+    def _condense_transcript(self, video_id: str, version: int, target_tokens: int = 2048) -> str:
+        """Reduce a transcript to its most representative segments within a token budget.
 
-        context_parts.append(
-            "\nRespond with the following format:"
-            "\n1. The exact timestamp (in the format MM:SS or HH:MM:SS) that best matches the user's request"
-            "\n2. A brief explanation (1-2 sentences) of why this is the right part of the video"
-            "\n3. If you're uncertain about the exact timestamp, state your confidence level and suggest an alternative approach"
-        )
+        Segments are scored by TF-IDF cosine similarity to the centroid of the whole
+        transcript, the best ones are kept until ``target_tokens`` is reached and the
+        selection is returned in chronological order.
+        """
+        condensed = self._cache_get(self._condensed_cache, video_id, version)
+        if condensed is not None:
+            return condensed
 
-        return "\n\n".join(context_parts)
+        transcript = self._get_transcript(video_id, version)
+        full_transcript = transcript.full_transcript.strip()
+        budget = target_tokens * _CHARS_PER_TOKEN
+
+        if len(full_transcript) <= budget:
+            condensed = full_transcript
+        elif not len(transcript):
+            condensed = full_transcript[:budget]
+        else:
+            texts = [text.strip() for text in transcript.texts]
+            try:
+                tfidf = TfidfVectorizer(stop_words="english").fit_transform(texts)
+                centroid = np.asarray(tfidf.mean(axis=0)).ravel()
+                scores = tfidf @ centroid
+            except ValueError:
+                # Only stop words in the transcript, keep the original order
+                scores = np.zeros(len(texts))
+
+            selected = []
+            used = 0
+            for index in np.argsort(-scores, kind="stable"):
+                length = len(texts[index]) + 1
+                if used + length > budget:
+                    continue
+                selected.append(index)
+                used += length
+
+            condensed = " ".join(texts[index] for index in sorted(selected))
+            logger.info(
+                f"Condensed transcript for video {video_id} from {len(transcript)} "
+                f"to {len(selected)} segments"
+            )
+
+        # An empty result means no transcript yet, look it up again next time
+        if condensed:
+            self._cache_set(self._condensed_cache, video_id, version, condensed)
+        return condensed
 
     def prepare_summary_context(self, video_id: str) -> str:
         """Prepare context for generating a video summary."""
-        full_transcript, segments = self.db.get_transcript(video_id)
-        if not full_transcript:
+        version = self.db.get_transcript_version(video_id)
+        prompt = self._cache_get(self._summary_prompt_cache, video_id, version)
+        if prompt is not None:
+            return prompt
+
+        transcript = self._condense_transcript(video_id, version)
+        if not transcript:
             return "No transcript available for this video."
 
-        return (
-            "Your task is to create a comprehensive summary of the following video transcript:\n\n"
-            f"{full_transcript}\n\n"
-            "Please structure your summary as follows:\n"
-            "1. A brief overview (2-3 sentences) describing the main topic\n"
-            "2. 3-5 key points or main ideas covered in the video\n"
-            "3. A concise conclusion\n\n"
-            "Keep the entire summary under 250 words while capturing the essential content and flow of the video."
-        )
+        prompt = _TRANSCRIPT_HEADER + transcript + _TASK_SEPARATOR + _SUMMARY_TASK
+        self._cache_set(self._summary_prompt_cache, video_id, version, prompt)
+        return prompt
 
     def prepare_quiz_context(self, video_id: str) -> str:
         """Prepare context for generating a quiz."""
-        full_transcript, segments = self.db.get_transcript(video_id)
-        if not full_transcript:
-            return "No transcript available for this video."
+        version = self.db.get_transcript_version(video_id)
+        prompt = self._cache_get(self._quiz_prompt_cache, video_id, version)
+        if prompt is not None:
+            return prompt
 
-        context = [
-            "Create a quiz based on the following video transcript:",
-            full_transcript,
-            "\nGenerate a balanced quiz with these specifications:",
-            "- 5 questions of mixed difficulty (2 easy, 2 medium, 1 challenging)",
-            "- Questions should cover different parts of the video, not just the beginning",
-            "- Include a mix of factual recall and conceptual understanding questions",
-            "- For each question, provide 4 plausible answer options with exactly one correct answer",
-            "- Make incorrect options realistic and plausible to test true understanding",
-            "\nFormat the output as a JSON array of objects with these fields:",
-            "- question: The quiz question text",
-            "- options: Array of 4 possible answers",
-            "- correctAnswerIndex: Index (0-3) of the correct answer",
-            "- difficulty: String indicating difficulty level ('easy', 'medium', or 'challenging')",
-        ]
-
-        return "\n\n".join(context)
+        transcript = self._condense_transcript(video_id, version)
+        if not transcript:
+            return "No transcript available for this video."
 
-    @staticmethod
-    def _format_timestamp(seconds: float) -> str:
-        """Convert seconds to MM:SS format."""
-        minutes, seconds = divmod(int(seconds), 60)
-        return f"{minutes}:{seconds:02d}"
+        prompt = _TRANSCRIPT_HEADER + transcript + _TASK_SEPARATOR + _QUIZ_TASK
+        self._cache_set(self._quiz_prompt_cache, video_id, version, prompt)
+        return prompt
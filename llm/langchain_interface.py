@@ -1,53 +1,252 @@
+import re
 import json
 import logging
-from typing import Dict, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import orjson
+from cachetools import TTLCache
+
 from .vllm_setup import VLLMServer
+from .vllm_engine import VLLMEngine
+from ..config import SEMANTIC_CACHE_TTL
+from ..storage import SemanticCache
 
 logger = logging.getLogger(__name__)
 
+# Captures a fenced ```json block if present, otherwise the outermost object/array
+_JSON_BLOCK_RE = re.compile(
+    r"```(?:json)?\s*(\{.*?\}|\[.*?\])\s*```|(\{.*\}|\[.*\])", re.DOTALL
+)
+
+# JSON schemas passed to vLLM guided decoding so structured responses always parse
+QUIZ_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "question": {"type": "string"},
+            "options": {
+                "type": "array",
+                "minItems": 4,
+                "maxItems": 4,
+                "items": {"type": "string"},
+            },
+            "correctAnswerIndex": {"type": "integer", "minimum": 0, "maximum": 3},
+            "difficulty": {"type": "string", "enum": ["easy", "medium", "challenging"]},
+        },
+        "required": ["question", "options", "correctAnswerIndex"],
+    },
+}
+
+NAVIGATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "timestamp": {"type": "string"},
+        "reason": {"type": "string"},
+    },
+    "required": ["timestamp", "reason"],
+}
+
+# Returned in place of a completion when the LLM call fails, so callers can tell a
+# failure apart from a real answer (and e.g. avoid caching or saving it)
+ANSWER_ERROR_MESSAGE = "Sorry, I couldn't process your question due to a system error."
+SUMMARY_ERROR_MESSAGE = "Unable to generate summary due to a system error."
+
+# The context comes first so prompts about the same video share a prefix in vLLM's
+# prefix cache, the instructions and question specific to each call follow it
+_ANSWER_TEMPLATE = (
+    "{context}\n\n"
+    "You are a helpful AI assistant who provides information about videos. "
+    "Provide a helpful answer based on the video content. "
+    "If the video content doesn't address the question, say so.\n\n"
+    "### Question: {query}\n"
+    "### Answer:"
+)
+
+# The summary and quiz contexts prepared by ContextManager already end with the full task
+# (length, number of questions, output format), these templates only add the cue
+_SUMMARY_TEMPLATE = "{context}\n\n### Summary:"
+
+_QUIZ_TEMPLATE = "{context}\n\n### Quiz:"
+
+_NAVIGATION_TEMPLATE = (
+    "{context}\n\n"
+    "Based on the transcript segments above, what is the most appropriate timestamp "
+    "to navigate to? Respond with only a JSON object containing: timestamp (string) "
+    "and reason (string).\n\n"
+    '### User query: "{query}"\n'
+    "### Navigation:"
+)
+
+
+def _parse_json_response(response: str) -> Any:
+    """Extract and decode the JSON payload of an LLM response."""
+    match = _JSON_BLOCK_RE.search(response)
+    payload = (match.group(1) or match.group(2)) if match else response
+    return orjson.loads(payload)
+
 
 class LangchainInterface:
     """Interface for using LLM capabilities via vLLM server."""
 
-    def __init__(self, llm_server: VLLMServer):
+    def __init__(
+        self,
+        llm_server: Union[VLLMServer, VLLMEngine],
+        semantic_cache: Optional[SemanticCache] = None,
+    ):
         """
         Initialize the LangchainInterface.
 
         Args:
-            llm_server: An initialized and started VLLMServer instance
+            llm_server: An initialized and started VLLMServer or VLLMEngine instance
+            semantic_cache: Optional cache of completions keyed on query embeddings
         """
         self.llm = llm_server
+        self.semantic_cache = semantic_cache
+        # Summaries and quizzes have no user query to compare, only one completion per
+        # prompt is kept: (video_id, task, prompt) -> completion
+        self._prompt_cache = TTLCache(maxsize=256, ttl=SEMANTIC_CACHE_TTL)
+        self._prompt_lock = threading.Lock()
 
-    def answer_question(self, query: str, context: str) -> str:
+    def _generate(
+        self,
+        prompt: str,
+        video_id: Optional[str],
+        cache_query: Optional[str],
+        task: str,
+        no_cache: bool = False,
+        transcript_version: int = 0,
+        **generate_kwargs,
+    ) -> str:
+        """Generate a completion, serving near-duplicate queries from the semantic cache.
+
+        Without a ``cache_query`` the prompt itself is the key of a plain lookup, an
+        embedding of a constant query would only ever match itself. The prompt embeds
+        the transcript, semantic matches are limited to ``transcript_version`` instead.
+        """
+        if self.semantic_cache is None or video_id is None or no_cache:
+            return self.llm.generate(prompt, **generate_kwargs)
+
+        if cache_query is None:
+            key = (video_id, task, prompt)
+            with self._prompt_lock:
+                cached_response = self._prompt_cache.get(key)
+            if cached_response is not None:
+                return cached_response
+
+            response = self.llm.generate(prompt, **generate_kwargs)
+            with self._prompt_lock:
+                self._prompt_cache[key] = response
+            return response
+
+        query_embedding = self.semantic_cache.embed(cache_query)
+        cached_response = self.semantic_cache.lookup(
+            video_id, query_embedding, task=task, version=transcript_version
+        )
+        if cached_response is not None:
+            return cached_response
+
+        response = self.llm.generate(prompt, **generate_kwargs)
+        self.semantic_cache.put(
+            video_id, query_embedding, response, task=task, version=transcript_version
+        )
+        return response
+
+    @staticmethod
+    def _build_answer_prompt(query: str, context: str) -> str:
+        """Build the question answering prompt."""
+        return _ANSWER_TEMPLATE.format(context=context.strip(), query=query.strip())
+
+    def answer_question(
+        self,
+        query: str,
+        context: str,
+        video_id: Optional[str] = None,
+        no_cache: bool = False,
+        transcript_version: int = 0,
+    ) -> str:
         """
         Answer a question based on provided context.
 
         Args:
             query: User's question about the video
             context: Video transcript or other contextual information
+            video_id: ID of the video, enables the semantic cache when given
+            no_cache: Whether to bypass the semantic cache
+            transcript_version: Version of the transcript the context was built from,
+                cached answers from other versions are not served
 
         Returns:
-            A string containing the answer to the question
+            A string containing the answer to the question, ANSWER_ERROR_MESSAGE on failure
         """
-        prompt_template = """
-        You are a helpful AI assistant who provides information about videos.
-        
-        {context}
-        
-        User question: {query}
-        
-        Provide a helpful answer based on the video content. If the video content doesn't address the question, say so.
-        
-        Answer:
+        prompt = self._build_answer_prompt(query, context)
+
+        try:
+            return self._generate(
+                prompt,
+                video_id,
+                query,
+                "qa",
+                no_cache,
+                transcript_version,
+                max_tokens=512,
+                temperature=0.7,
+            )
+        except Exception as e:
+            logger.error(f"Error generating answer: {str(e)}")
+            return ANSWER_ERROR_MESSAGE
+
+    def answer_question_stream(
+        self,
+        query: str,
+        context: str,
+        video_id: Optional[str] = None,
+        no_cache: bool = False,
+        transcript_version: int = 0,
+    ) -> Iterator[str]:
+        """
+        Answer a question based on provided context, yielding the answer as it is generated.
+
+        Args:
+            query: User's question about the video
+            context: Video transcript or other contextual information
+            video_id: ID of the video, enables the semantic cache when given
+            no_cache: Whether to bypass the semantic cache
+            transcript_version: Version of the transcript the context was built from,
+                cached answers from other versions are not served
+
+        Yields:
+            Chunks of the answer text
         """
+        prompt = self._build_answer_prompt(query, context)
 
-        prompt = prompt_template.format(context=context, query=query)
+        use_cache = self.semantic_cache is not None and video_id is not None and not no_cache
+        if use_cache:
+            query_embedding = self.semantic_cache.embed(query)
+            cached_response = self.semantic_cache.lookup(
+                video_id, query_embedding, task="qa", version=transcript_version
+            )
+            if cached_response is not None:
+                yield cached_response
+                return
 
+        chunks = []
         try:
-            return self.llm.generate(prompt, max_tokens=512, temperature=0.7)
+            for chunk in self.llm.generate_stream(prompt, max_tokens=512, temperature=0.7):
+                chunks.append(chunk)
+                yield chunk
         except Exception as e:
             logger.error(f"Error generating answer: {str(e)}")
-            return "Sorry, I couldn't process your question due to a system error."
+            if not chunks:
+                yield ANSWER_ERROR_MESSAGE
+            return
+
+        if use_cache:
+            self.semantic_cache.put(
+                video_id, query_embedding, "".join(chunks), task="qa", version=transcript_version
+            )
 
     def get_navigation_point(self, query: str, context: str) -> Dict:
         """
@@ -60,30 +259,16 @@ class LangchainInterface:
         Returns:
             Dict containing timestamp and reason
         """
-        prompt_template = """
-        {context}
-        
-        User query: "{query}"
-        
-        Based on the transcript segments, what is the most appropriate timestamp to navigate to?
-        Respond with only a JSON object containing: timestamp (string) and reason (string).
-        """
-
-        prompt = prompt_template.format(context=context, query=query)
+        prompt = _NAVIGATION_TEMPLATE.format(context=context.strip(), query=query.strip())
 
         try:
-            response = self.llm.generate(prompt, max_tokens=256, temperature=0.3)
+            response = self.llm.generate(
+                prompt, max_tokens=256, temperature=0.3, guided_json=NAVIGATION_SCHEMA
+            )
 
             # Extract JSON from the response
             try:
-                # Find JSON-like content in the response
-                response = response.strip()
-                if response.startswith("```json"):
-                    response = response.split("```json")[1].split("```")[0].strip()
-                elif response.startswith("```"):
-                    response = response.split("```")[1].split("```")[0].strip()
-
-                result = json.loads(response)
+                result = _parse_json_response(response)
                 if "timestamp" not in result or "reason" not in result:
                     logger.warning(f"Incomplete navigation response: {result}")
                     return {
@@ -98,72 +283,61 @@ class LangchainInterface:
             logger.error(f"Error generating navigation point: {str(e)}")
             return {"timestamp": "00:00:00", "reason": "Error processing navigation request"}
 
-    def generate_summary(self, context: str) -> str:
+    def generate_summary(
+        self, context: str, video_id: Optional[str] = None, no_cache: bool = False
+    ) -> str:
         """
         Generate a summary of a video.
 
         Args:
             context: Video transcript or other content to summarize
+            video_id: ID of the video, enables the completion cache when given
+            no_cache: Whether to bypass the completion cache
 
         Returns:
-            A concise summary of the video
-        """
-        prompt_template = """
-        {context}
-        
-        Create a concise summary of this video transcript in about 3-5 sentences.
-        Focus on the main points and key insights.
-        
-        Summary:
+            A concise summary of the video, SUMMARY_ERROR_MESSAGE on failure
         """
-
-        prompt = prompt_template.format(context=context)
+        prompt = _SUMMARY_TEMPLATE.format(context=context.strip())
 
         try:
-            return self.llm.generate(prompt, max_tokens=300, temperature=0.5)
+            return self._generate(
+                prompt, video_id, None, "summary", no_cache, max_tokens=300, temperature=0.5
+            )
         except Exception as e:
             logger.error(f"Error generating summary: {str(e)}")
-            return "Unable to generate summary due to a system error."
+            return SUMMARY_ERROR_MESSAGE
 
-    def generate_quiz(self, context: str) -> List[Dict]:
+    def generate_quiz(
+        self, context: str, video_id: Optional[str] = None, no_cache: bool = False
+    ) -> List[Dict]:
         """
         Generate a quiz based on video content.
 
         Args:
             context: Video transcript or content
+            video_id: ID of the video, enables the completion cache when given
+            no_cache: Whether to bypass the completion cache, e.g. when regenerating
 
         Returns:
-            List of quiz questions with answers
+            List of quiz questions with answers, empty on failure
         """
-        prompt_template = """
-        {context}
-        
-        Based on the video content, generate 3 multiple-choice quiz questions that test understanding of the key concepts.
-        
-        For each question:
-        1. Provide the question text
-        2. Provide 4 possible answers (A, B, C, D)
-        3. Indicate the correct answer
-        
-        Return your response as a JSON array where each item has the format:
-        {{"question": "Question text", "options": ["Option A", "Option B", "Option C", "Option D"], "correct": "A"}}
-        """
-
-        prompt = prompt_template.format(context=context)
+        prompt = _QUIZ_TEMPLATE.format(context=context.strip())
 
         try:
-            response = self.llm.generate(prompt, max_tokens=800, temperature=0.7)
+            response = self._generate(
+                prompt,
+                video_id,
+                None,
+                "quiz",
+                no_cache,
+                max_tokens=800,
+                temperature=0.7,
+                guided_json=QUIZ_SCHEMA,
+            )
 
             # Extract JSON from the response
             try:
-                # Find JSON-like content in the response
-                response = response.strip()
-                if response.startswith("```json"):
-                    response = response.split("```json")[1].split("```")[0].strip()
-                elif response.startswith("```"):
-                    response = response.split("```")[1].split("```")[0].strip()
-
-                result = json.loads(response)
+                result = _parse_json_response(response)
                 # Validate the structure
                 if not isinstance(result, list):
                     logger.warning("Quiz response is not a list")
@@ -171,7 +345,7 @@ class LangchainInterface:
 
                 # Validate each question
                 for item in result:
-                    if not all(key in item for key in ["question", "options", "correct"]):
+                    if not all(key in item for key in QUIZ_SCHEMA["items"]["required"]):
                         logger.warning(f"Invalid quiz question format: {item}")
 
                 return result
@@ -181,3 +355,46 @@ class LangchainInterface:
         except Exception as e:
             logger.error(f"Error generating quiz: {str(e)}")
             return []
+
+    def generate_digest(
+        self,
+        summary_context: str,
+        quiz_context: str,
+        questions: Optional[List[Tuple[str, str]]] = None,
+        video_id: Optional[str] = None,
+        transcript_version: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Generate a summary, a quiz and answers to key questions in one concurrent batch.
+
+        Args:
+            summary_context: Context prepared for summarization
+            quiz_context: Context prepared for quiz generation
+            questions: Optional list of (query, context) pairs to answer
+            video_id: ID of the video, enables the semantic cache when given
+            transcript_version: Version of the transcript the contexts were built from
+
+        Returns:
+            Dict containing summary, quiz and answers (in the order of questions)
+        """
+        questions = questions or []
+
+        with ThreadPoolExecutor(max_workers=2 + len(questions)) as executor:
+            summary_future = executor.submit(self.generate_summary, summary_context, video_id)
+            quiz_future = executor.submit(self.generate_quiz, quiz_context, video_id)
+            answer_futures = [
+                executor.submit(
+                    self.answer_question,
+                    query,
+                    context,
+                    video_id,
+                    transcript_version=transcript_version,
+                )
+                for query, context in questions
+            ]
+
+            return {
+                "summary": summary_future.result(),
+                "quiz": quiz_future.result(),
+                "answers": [future.result() for future in answer_futures],
+            }
@@ -0,0 +1,193 @@
+import os
+import logging
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from ..config import (
+    VLLM_MODE,
+    VLLM_MODEL,
+    VLLM_MAX_MODEL_LEN,
+    VLLM_QUANTIZATION,
+    VLLM_GPU_MEMORY_UTILIZATION,
+    VLLM_MAX_NUM_BATCHED_TOKENS,
+    VLLM_MAX_NUM_SEQS,
+    VLLM_KV_CACHE_DTYPE,
+    VLLM_SWAP_SPACE,
+)
+from .vllm_setup import VLLMServer, resolve_kv_cache_dtype
+
+logger = logging.getLogger(__name__)
+
+
+class VLLMEngine:
+    """Runs vLLM in-process, a drop-in replacement for VLLMServer without the HTTP hop.
+
+    Suited to single-process deployments: prompts are handed to the engine
+    directly instead of being serialized to JSON and sent over a socket.
+    """
+
+    def __init__(
+        self,
+        model_name: str = VLLM_MODEL,
+        max_model_len: int = VLLM_MAX_MODEL_LEN,
+        download_dir: str = None,
+        gpu_memory_utilization: float = VLLM_GPU_MEMORY_UTILIZATION,
+        max_num_batched_tokens: int = VLLM_MAX_NUM_BATCHED_TOKENS,
+        max_num_seqs: int = VLLM_MAX_NUM_SEQS,
+        kv_cache_dtype: str = VLLM_KV_CACHE_DTYPE,
+        swap_space: int = VLLM_SWAP_SPACE,
+        quantization: Optional[str] = VLLM_QUANTIZATION,
+    ):
+        self.model_name = model_name
+        self.max_model_len = max_model_len
+        self.gpu_memory_utilization = gpu_memory_utilization
+        self.max_num_batched_tokens = max_num_batched_tokens
+        self.max_num_seqs = max_num_seqs
+        self.kv_cache_dtype = kv_cache_dtype
+        self.swap_space = swap_space
+        self.quantization = quantization
+        self.download_dir = download_dir or os.path.expanduser("~/.cache/huggingface")
+        self.llm = None
+        # vllm.LLM is not thread-safe, requests from several threads take turns
+        self._lock = threading.Lock()
+
+    def is_server_running(self) -> bool:
+        """Check if the engine is loaded."""
+        return self.llm is not None
+
+    def start(self, wait_ready: bool = True, timeout: int = 60 * 20) -> bool:
+        """Load the model into the engine.
+
+        Loading always blocks, ``wait_ready`` and ``timeout`` exist for
+        compatibility with VLLMServer.start.
+        """
+        if self.llm is not None:
+            logger.info("vLLM engine is already loaded")
+            return True
+
+        try:
+            from vllm import LLM
+
+            logger.info(f"Loading vLLM engine for {self.model_name}")
+            kwargs = {}
+            if self.quantization:
+                # INT4 weight-only kernels run with FP16 activations
+                kwargs.update(quantization=self.quantization, dtype="float16")
+
+            self.llm = LLM(
+                model=self.model_name,
+                max_model_len=self.max_model_len,
+                download_dir=self.download_dir,
+                load_format="safetensors",
+                tensor_parallel_size=1,
+                enable_prefix_caching=True,
+                block_size=16,
+                gpu_memory_utilization=self.gpu_memory_utilization,
+                max_num_batched_tokens=self.max_num_batched_tokens,
+                max_num_seqs=self.max_num_seqs,
+                kv_cache_dtype=resolve_kv_cache_dtype(self.kv_cache_dtype),
+                swap_space=self.swap_space,
+                **kwargs,
+            )
+            logger.info("vLLM engine loaded")
+            return True
+        except Exception as e:
+            logger.error(f"Error loading vLLM engine: {str(e)}")
+            self.llm = None
+            return False
+
+    def stop(self):
+        """Release the engine."""
+        if self.llm is not None:
+            self.llm = None
+            logger.info("vLLM engine stopped")
+
+    def _ensure_ready(self):
+        """Raise if the engine is not loaded."""
+        if self.llm is None:
+            logger.error("vLLM engine is not loaded")
+            raise RuntimeError("vLLM engine is not loaded")
+
+    @staticmethod
+    def _sampling_params(
+        max_tokens: int,
+        temperature: float,
+        stop: Optional[List[str]],
+        guided_json: Optional[Dict[str, Any]],
+    ):
+        """Build vLLM sampling parameters."""
+        from vllm import SamplingParams
+        from vllm.sampling_params import GuidedDecodingParams
+
+        return SamplingParams(
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stop=stop,
+            guided_decoding=GuidedDecodingParams(json=guided_json) if guided_json else None,
+        )
+
+    def generate_batch(
+        self,
+        prompts: List[str],
+        max_tokens: int = 512,
+        temperature: float = 0.7,
+        stop: Optional[List[str]] = None,
+        wait_if_starting: bool = True,
+        timeout: int = 60,
+        guided_json: Optional[Dict[str, Any]] = None,
+    ) -> List[str]:
+        """Generate completions for several prompts in one engine call.
+
+        Args:
+            prompts: Input text prompts
+            max_tokens: Maximum tokens to generate per prompt
+            temperature: Sampling temperature
+            stop: Optional stop sequences
+            wait_if_starting: Unused, kept for compatibility with VLLMServer
+            timeout: Unused, kept for compatibility with VLLMServer
+            guided_json: Optional JSON schema every output is constrained to
+
+        Returns:
+            Generated text strings in the same order as prompts
+        """
+        if not prompts:
+            return []
+
+        self._ensure_ready()
+        params = self._sampling_params(max_tokens, temperature, stop, guided_json)
+        with self._lock:
+            outputs = self.llm.generate(prompts, params, use_tqdm=False)
+        return [output.outputs[0].text for output in outputs]
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        """Generate text for a single prompt, accepts the options of generate_batch()."""
+        return self.generate_batch([prompt], **kwargs)[0]
+
+    def generate_full(self, prompt: str, **kwargs) -> str:
+        """Generate text for a single prompt, same as generate()."""
+        return self.generate(prompt, **kwargs)
+
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Yield the completion of a prompt.
+
+        The offline engine returns whole completions, so this yields a single chunk.
+        """
+        yield self.generate(prompt, **kwargs)
+
+
+def create_llm(mode: str = VLLM_MODE, **kwargs) -> Union[VLLMServer, VLLMEngine]:
+    """Create the LLM backend selected by ``mode``.
+
+    Args:
+        mode: "http" for a VLLMServer talking to `vllm serve`, "embedded" for an in-process
+            VLLMEngine
+        **kwargs: Options passed to the backend constructor
+
+    Returns:
+        The backend, not started yet
+    """
+    if mode == "embedded":
+        return VLLMEngine(**kwargs)
+    if mode == "http":
+        return VLLMServer(**kwargs)
+    raise ValueError(f"Unknown vLLM mode: {mode}")
@@ -1,15 +1,145 @@
 import os
 import time
+import queue
+import httpx
+import orjson
+import select
+import asyncio
+import atexit
 import logging
 import threading
 import requests
 import subprocess
-from typing import Optional, List
-
-from ..config import VLLM_MODEL, VLLM_PORT, VLLM_HOST, VLLM_MAX_MODEL_LEN
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional, List, Tuple, Union
+from requests.adapters import HTTPAdapter
+
+from ..config import (
+    VLLM_MODEL,
+    VLLM_PORT,
+    VLLM_HOST,
+    VLLM_MAX_MODEL_LEN,
+    VLLM_QUANTIZATION,
+    VLLM_GPU_MEMORY_UTILIZATION,
+    VLLM_MAX_NUM_BATCHED_TOKENS,
+    VLLM_MAX_NUM_SEQS,
+    VLLM_KV_CACHE_DTYPE,
+    VLLM_SWAP_SPACE,
+    VLLM_LOG_PATH,
+    VLLM_MICRO_BATCH,
+    VLLM_MICRO_BATCH_SIZE,
+    VLLM_MICRO_BATCH_WAIT_MS,
+)
 
 logger = logging.getLogger(__name__)
 
+# (connect, read) timeout for requests to the vLLM server
+HTTP_TIMEOUT = (1, 120)
+# Upper bound on waiting for a micro-batched completion: queueing plus one full request
+BATCH_RESULT_TIMEOUT = sum(HTTP_TIMEOUT) + 30
+# Readiness probes must fail fast while the server is still binding its socket
+PROBE_TIMEOUT = (0.5, 1.0)
+JSON_HEADERS = {"Content-Type": "application/json"}
+# Seconds a successful readiness check is trusted before probing again
+READY_TTL = 5.0
+
+
+def _gpu_compute_capability() -> Optional[float]:
+    """Return the compute capability of the first GPU reported by nvidia-smi, if any."""
+    try:
+        output = subprocess.run(
+            ["nvidia-smi", "--query-gpu=compute_cap", "--format=csv,noheader"],
+            capture_output=True,
+            text=True,
+            timeout=10,
+            check=True,
+        ).stdout
+        return float(output.splitlines()[0])
+    except (OSError, subprocess.SubprocessError, ValueError, IndexError):
+        return None
+
+
+def resolve_kv_cache_dtype(kv_cache_dtype: str) -> str:
+    """Fall back to the model dtype for the KV cache when the GPU lacks native FP8."""
+    if not kv_cache_dtype.startswith("fp8"):
+        return kv_cache_dtype
+
+    compute_capability = _gpu_compute_capability()
+    if compute_capability is None or compute_capability < 8.9:
+        logger.warning(
+            f"FP8 KV cache needs compute capability >= 8.9 (found {compute_capability}), "
+            "using auto instead"
+        )
+        return "auto"
+    return kv_cache_dtype
+
+
+class _MicroBatcher:
+    """Coalesces concurrent single-prompt requests into batched completions requests.
+
+    Requests arriving within ``max_wait`` seconds of each other, up to ``max_batch``,
+    are sent as one multi-prompt request per distinct set of generation options.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[List[str], Dict[str, Any]], List[str]],
+        max_batch: int = VLLM_MICRO_BATCH_SIZE,
+        max_wait: float = VLLM_MICRO_BATCH_WAIT_MS / 1000,
+    ):
+        self._send = send
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[Tuple[str, Dict[str, Any], Tuple, Future]]" = queue.Queue()
+        # Batches are sent from a pool so a long generation doesn't hold up the next batch
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="vllm-batch")
+        threading.Thread(target=self._run, name="vllm-batcher", daemon=True).start()
+
+    def submit(self, prompt: str, options: Dict[str, Any]) -> Future:
+        """Queue a prompt, the returned future resolves to its completion text."""
+        future = Future()
+        key = (
+            options["max_tokens"],
+            options["temperature"],
+            tuple(options["stop"] or ()),
+            orjson.dumps(options["guided_json"]) if options["guided_json"] is not None else None,
+        )
+        self._queue.put((prompt, options, key, future))
+        return future
+
+    def _run(self):
+        """Collect queued requests into batches and hand them to the sender pool."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            groups: Dict[Tuple, List[Tuple[str, Dict[str, Any], Tuple, Future]]] = {}
+            for item in batch:
+                groups.setdefault(item[2], []).append(item)
+            for items in groups.values():
+                self._executor.submit(self._flush, items)
+
+    def _flush(self, items: List[Tuple[str, Dict[str, Any], Tuple, Future]]):
+        """Send one batched request and resolve the futures of its prompts."""
+        try:
+            texts = self._send([item[0] for item in items], items[0][1])
+        except Exception as e:
+            for item in items:
+                item[3].set_exception(e)
+            return
+
+        for item, text in zip(items, texts):
+            item[3].set_result(text)
+
 
 class VLLMServer:
     """Manages a vLLM server for local LLM hosting."""
@@ -21,14 +151,41 @@ class VLLMServer:
         host: str = VLLM_HOST,
         max_model_len: int = VLLM_MAX_MODEL_LEN,
         download_dir: str = None,
+        gpu_memory_utilization: float = VLLM_GPU_MEMORY_UTILIZATION,
+        max_num_batched_tokens: int = VLLM_MAX_NUM_BATCHED_TOKENS,
+        max_num_seqs: int = VLLM_MAX_NUM_SEQS,
+        kv_cache_dtype: str = VLLM_KV_CACHE_DTYPE,
+        swap_space: int = VLLM_SWAP_SPACE,
+        quantization: Optional[str] = VLLM_QUANTIZATION,
+        log_path: str = VLLM_LOG_PATH,
+        micro_batch: bool = VLLM_MICRO_BATCH,
     ):
         self.model_name = model_name
         self.port = port
         self.host = host
         self.max_model_len = max_model_len
+        self.gpu_memory_utilization = gpu_memory_utilization
+        self.max_num_batched_tokens = max_num_batched_tokens
+        self.max_num_seqs = max_num_seqs
+        self.kv_cache_dtype = kv_cache_dtype
+        self.swap_space = swap_space
+        self.quantization = quantization
+        self.log_path = log_path
+        self.micro_batch = micro_batch
+        self._batcher: Optional[_MicroBatcher] = None
+        self._batcher_lock = threading.Lock()
         self.process = None
         self.api_base = f"http://{host}:{port}/v1"
-        self._server_thread = None
+        self.health_url = f"http://{host}:{port}/health"
+        # Becomes readable when the server process exits (Linux pidfd), else set by a thread
+        self._pidfd: Optional[int] = None
+        self._exit_event = threading.Event()
+        self._ready_until = 0.0
+
+        # Keep-alive connections to the server, created on first use and reused per call
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+        atexit.register(self._close_session)
 
         # Set a default download directory if None is provided
         if download_dir is None:
@@ -37,10 +194,29 @@ class VLLMServer:
         else:
             self.download_dir = download_dir
 
+    def _get_session(self) -> requests.Session:
+        """Return the pooled HTTP session, creating it on first use."""
+        session = self._session
+        if session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+                    self._session = session
+                session = self._session
+        return session
+
+    def _close_session(self):
+        """Close the pooled HTTP session, safe to call more than once."""
+        with self._session_lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
     def is_server_running(self) -> bool:
-        """Check if vLLM server is running by sending a test request."""
+        """Check if vLLM server is running by probing its health endpoint."""
         try:
-            response = requests.get(f"{self.api_base}/models")
+            response = self._get_session().get(self.health_url, timeout=PROBE_TIMEOUT)
             return response.status_code == 200
         except requests.exceptions.RequestException:
             return False
@@ -50,7 +226,7 @@ class VLLMServer:
         return self.process is not None and self.process.poll() is None
 
     def _start_server_process(self):
-        """Start the vLLM server process."""
+        """Launch the vLLM server process and start watching for it to exit."""
         command = [
             "vllm",
             "serve",
@@ -67,40 +243,83 @@ class VLLMServer:
             "safetensors",
             "--tensor-parallel-size",
             "1",
+            # Reuse KV blocks across requests that share a prompt prefix
+            "--enable-prefix-caching",
+            "--block-size",
+            "16",
+            "--gpu-memory-utilization",
+            str(self.gpu_memory_utilization),
+            "--max-num-batched-tokens",
+            str(self.max_num_batched_tokens),
+            "--max-num-seqs",
+            str(self.max_num_seqs),
+            "--kv-cache-dtype",
+            resolve_kv_cache_dtype(self.kv_cache_dtype),
+            "--swap-space",
+            str(self.swap_space),
         ]
 
+        if self.quantization:
+            # INT4 weight-only kernels run with FP16 activations
+            command.extend(["--quantization", self.quantization, "--dtype", "float16"])
+
         logger.info(f"Starting vLLM server with command: {' '.join(command)}")
 
-        try:
+        # Server output goes straight to a log file instead of through a pipe into Python,
+        # the previous run's log is kept alongside for debugging
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        if os.path.exists(self.log_path):
+            os.replace(self.log_path, f"{self.log_path}.1")
+
+        self._exit_event.clear()
+        with open(self.log_path, "ab", buffering=0) as log_file:
             self.process = subprocess.Popen(
-                command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+                command, stdout=log_file, stderr=subprocess.STDOUT, close_fds=True
             )
+        logger.info(f"vLLM server output is written to {self.log_path}")
 
-            # Wait for server to start (up to 60 seconds)
-            max_wait = 60 * 20
-            start_time = time.time()
-            while not self.is_server_running() and time.time() - start_time < max_wait:
-                time.sleep(1)
+        self._close_pidfd()
+        if hasattr(os, "pidfd_open"):
+            try:
+                self._pidfd = os.pidfd_open(self.process.pid)
+                return
+            except OSError:
+                pass  # kernel older than 5.3
+
+        threading.Thread(
+            target=self._watch_process, args=(self.process,), name="vllm-exit", daemon=True
+        ).start()
+
+    def _watch_process(self, process: subprocess.Popen):
+        """Wake up anyone waiting for readiness as soon as the server process exits."""
+        process.wait()
+        self._exit_event.set()
+
+    def _wait_for_exit(self, timeout: float) -> bool:
+        """Block for up to ``timeout`` seconds, returning True once the server process exits."""
+        pidfd = self._pidfd
+        if pidfd is None:
+            return self._exit_event.wait(timeout)
+        try:
+            readable, _, _ = select.select([pidfd], [], [], timeout)
+        except (OSError, ValueError):
+            # Closed by stop() while waiting
+            return True
+        return bool(readable)
 
-                # Check if process has exited
-                if self.process.poll() is not None:
-                    stdout, stderr = self.process.communicate()
-                    logger.error(f"vLLM server process exited with code {self.process.returncode}")
-                    logger.error(f"STDOUT: {stdout}")
-                    logger.error(f"STDERR: {stderr}")
-                    raise RuntimeError(f"vLLM server failed to start: {stderr}")
+    def _close_pidfd(self):
+        """Close the pidfd of the server process, if any."""
+        pidfd, self._pidfd = self._pidfd, None
+        if pidfd is not None:
+            os.close(pidfd)
 
-            if self.is_server_running():
-                logger.info(f"vLLM server started successfully at {self.api_base}")
-            else:
-                logger.error("vLLM server failed to start within timeout")
-                self.stop()
-                raise TimeoutError("vLLM server failed to start within timeout")
-
-        except Exception as e:
-            logger.error(f"Error starting vLLM server: {str(e)}")
-            self.stop()
-            raise
+    def _log_tail(self, lines: int = 200) -> str:
+        """Return the last lines of the server log."""
+        try:
+            with open(self.log_path, "r", errors="replace") as f:
+                return "".join(deque(f, maxlen=lines))
+        except OSError:
+            return ""
 
     def wait_until_ready(self, timeout: int = 60 * 20) -> bool:
         """Wait until the server is ready to handle requests.
@@ -112,28 +331,73 @@ class VLLMServer:
             bool: True if server is running, False if timed out
         """
         logger.info(f"Waiting for vLLM server to be ready (timeout: {timeout}s)...")
-        start_time = time.time()
-
-        while time.time() - start_time < timeout:
-            if not self.is_process_alive():
-                if self.process is not None:
-                    stdout, stderr = self.process.communicate()
-                    logger.error(f"vLLM server process exited with code {self.process.returncode}")
-                    logger.error(f"STDOUT: {stdout}")
-                    logger.error(f"STDERR: {stderr}")
-                return False
+        if self.process is None:
+            return self.is_server_running()
 
+        # Probe with backoff, the kernel wakes us early if the process dies
+        deadline = time.monotonic() + timeout
+        delay = 0.2
+        while not self._wait_for_exit(delay):
             if self.is_server_running():
                 logger.info(f"vLLM server is now ready at {self.api_base}")
                 return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            delay = min(delay * 1.5, 5.0, remaining)
 
-            time.sleep(2)
+        if self.is_server_running():
+            logger.info(f"vLLM server is now ready at {self.api_base}")
+            return True
+
+        return self._report_not_ready(timeout)
+
+    async def wait_until_ready_async(self, timeout: int = 60 * 20) -> bool:
+        """Wait until the server is ready without blocking the running event loop.
+
+        Args:
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            bool: True if server is running, False if timed out
+        """
+        logger.info(f"Waiting for vLLM server to be ready (timeout: {timeout}s)...")
+        deadline = time.monotonic() + timeout
+        delay = 0.2
+
+        async with httpx.AsyncClient(
+            timeout=httpx.Timeout(PROBE_TIMEOUT[1], connect=PROBE_TIMEOUT[0]),
+            limits=httpx.Limits(max_keepalive_connections=8),
+        ) as client:
+            while True:
+                try:
+                    response = await client.get(self.health_url)
+                    if response.status_code == 200:
+                        logger.info(f"vLLM server is now ready at {self.api_base}")
+                        return True
+                except httpx.HTTPError:
+                    pass
+
+                remaining = deadline - time.monotonic()
+                if not self.is_process_alive() or remaining <= 0:
+                    return self._report_not_ready(timeout)
+
+                await asyncio.sleep(min(delay, remaining))
+                delay = min(delay * 1.5, 5.0)
+
+    def _report_not_ready(self, timeout: int) -> bool:
+        """Log why the server did not become ready and return False."""
+        if not self.is_process_alive():
+            if self.process is not None:
+                logger.error(f"vLLM server process exited with code {self.process.poll()}")
+                logger.error("Server output:\n" + self._log_tail())
+            return False
 
         logger.warning(f"Timed out after {timeout}s waiting for vLLM server to become ready")
         return False
 
     def start(self, wait_ready: bool = True, timeout: int = 60 * 20):
-        """Start the vLLM server in a separate thread.
+        """Start the vLLM server process.
 
         Args:
             wait_ready: Whether to block until server is ready
@@ -143,28 +407,25 @@ class VLLMServer:
             logger.info("vLLM server is already running")
             return True
 
-        if self._server_thread is not None and self._server_thread.is_alive():
-            logger.warning("Server thread already exists and is alive")
+        if self.is_process_alive():
+            logger.warning("Server process already exists and is alive")
             if wait_ready:
                 return self.wait_until_ready(timeout)
             return False
 
-        # Launch the server in a thread
-        self._server_thread = threading.Thread(target=self._start_server_process)
-        self._server_thread.daemon = True
-        self._server_thread.start()
-
-        # Initial wait to give process time to start
-        time.sleep(5)
-
-        # Check if process has failed to start
-        if not self.is_process_alive():
-            logger.error("vLLM server process failed to start")
+        try:
+            self._start_server_process()
+        except Exception as e:
+            logger.error(f"Error starting vLLM server: {str(e)}")
+            self.stop()
             return False
 
         # If requested, wait until the server is fully ready
         if wait_ready:
-            return self.wait_until_ready(timeout)
+            if self.wait_until_ready(timeout):
+                return True
+            self.stop()
+            return False
 
         # Otherwise just check if it seems to be starting
         if self.is_process_alive():
@@ -173,6 +434,23 @@ class VLLMServer:
 
         return False
 
+    async def start_async(self, timeout: int = 60 * 20) -> bool:
+        """Start the vLLM server process and await its readiness.
+
+        Launching the process is synchronous and quick, callers can wrap this
+        coroutine in ``asyncio.create_task`` to keep serving while the model loads.
+
+        Args:
+            timeout: Maximum time to wait for server readiness in seconds
+        """
+        if not self.is_process_alive() and not self.start(wait_ready=False):
+            return False
+
+        if await self.wait_until_ready_async(timeout):
+            return True
+        self.stop()
+        return False
+
     def stop(self):
         """Stop the vLLM server."""
         if self.process is not None:
@@ -187,6 +465,61 @@ class VLLMServer:
             self.process = None
             logger.info("vLLM server stopped")
 
+        self._close_pidfd()
+        self._ready_until = 0.0
+        self._close_session()
+
+    def _ensure_ready(self, wait_if_starting: bool, timeout: int):
+        """Raise if the server cannot serve requests, optionally waiting for it to load."""
+        if time.monotonic() < self._ready_until:
+            return
+
+        if not self.is_server_running():
+            # If process is alive but server isn't accepting connections, it might still be loading
+            if self.is_process_alive() and wait_if_starting:
+                logger.info("vLLM server process is alive but not ready yet, waiting...")
+                if not self.wait_until_ready(timeout):
+                    raise RuntimeError("vLLM server failed to become ready within timeout")
+            else:
+                logger.error("vLLM server is not running")
+                raise RuntimeError("vLLM server is not running")
+
+        self._ready_until = time.monotonic() + READY_TTL
+
+    def _build_payload(
+        self,
+        prompt: Union[str, List[str]],
+        max_tokens: int,
+        temperature: float,
+        stop: Optional[List[str]],
+        guided_json: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Build the request body for the completions endpoint."""
+        payload = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+
+        if stop:
+            payload["stop"] = stop
+        if guided_json is not None:
+            # vLLM extension: constrain decoding to output matching this JSON schema
+            payload["guided_json"] = guided_json
+
+        return payload
+
+    def _post_completions(self, payload: Dict[str, Any], stream: bool = False):
+        """POST a JSON payload to the completions endpoint."""
+        return self._get_session().post(
+            f"{self.api_base}/completions",
+            data=orjson.dumps(payload),
+            headers=JSON_HEADERS,
+            stream=stream,
+            timeout=HTTP_TIMEOUT,
+        )
+
     def generate(
         self,
         prompt: str,
@@ -195,6 +528,7 @@ class VLLMServer:
         stop: Optional[List[str]] = None,
         wait_if_starting: bool = True,
         timeout: int = 60,
+        guided_json: Optional[Dict[str, Any]] = None,
     ) -> str:
         """Generate text using the vLLM API.
 
@@ -205,39 +539,161 @@ class VLLMServer:
             stop: Optional stop sequences
             wait_if_starting: Whether to wait if server is still starting
             timeout: How long to wait for server to be ready
+            guided_json: Optional JSON schema the output is constrained to
 
         Returns:
             Generated text string
         """
-        # Check if server is running
-        if not self.is_server_running():
-            # If process is alive but server isn't accepting connections, it might still be loading
-            if self.is_process_alive() and wait_if_starting:
-                logger.info("vLLM server process is alive but not ready yet, waiting...")
-                if not self.wait_until_ready(timeout):
-                    raise RuntimeError("vLLM server failed to become ready within timeout")
-            else:
-                logger.error("vLLM server is not running")
-                raise RuntimeError("vLLM server is not running")
-
+        self._ensure_ready(wait_if_starting, timeout)
+
+        options = {
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stop": stop,
+            "guided_json": guided_json,
+        }
+        if self.micro_batch:
+            # Bounded so callers can't hang forever if the batcher thread has died
+            return self._get_batcher().submit(prompt, options).result(timeout=BATCH_RESULT_TIMEOUT)
+        return self._complete([prompt], options)[0]
+
+    def _get_batcher(self) -> _MicroBatcher:
+        """Return the micro-batcher, starting it on first use."""
+        with self._batcher_lock:
+            if self._batcher is None:
+                self._batcher = _MicroBatcher(self._complete)
+            return self._batcher
+
+    def _complete(self, prompts: List[str], options: Dict[str, Any]) -> List[str]:
+        """Send one completions request for all prompts and return texts in prompt order."""
         try:
-            payload = {
-                "model": self.model_name,
-                "prompt": prompt,
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-            }
-
-            if stop:
-                payload["stop"] = stop
+            payload = self._build_payload(
+                prompts[0] if len(prompts) == 1 else prompts,
+                options["max_tokens"],
+                options["temperature"],
+                options["stop"],
+                options["guided_json"],
+            )
 
             logger.debug(f"Sending request to vLLM API: {payload}")
-            response = requests.post(f"{self.api_base}/completions", json=payload)
+            response = self._post_completions(payload)
             response.raise_for_status()
 
-            result = response.json()
-            return result["choices"][0]["text"]
+            texts = [""] * len(prompts)
+            for choice in orjson.loads(response.content)["choices"]:
+                texts[choice["index"]] = choice["text"]
+            return texts
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Error calling vLLM API: {str(e)}")
+            self._ready_until = 0.0
             raise
+
+    def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 512,
+        temperature: float = 0.7,
+        stop: Optional[List[str]] = None,
+        wait_if_starting: bool = True,
+        timeout: int = 60,
+        guided_json: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[str]:
+        """Generate text using the vLLM API, yielding text deltas as they are decoded.
+
+        Args:
+            prompt: Input text prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            stop: Optional stop sequences
+            wait_if_starting: Whether to wait if server is still starting
+            timeout: How long to wait for server to be ready
+            guided_json: Optional JSON schema the output is constrained to
+
+        Yields:
+            Chunks of generated text
+        """
+        self._ensure_ready(wait_if_starting, timeout)
+
+        payload = self._build_payload(prompt, max_tokens, temperature, stop, guided_json)
+        payload["stream"] = True
+        # Ask for a final chunk with token counts, it carries no choices
+        payload["stream_options"] = {"include_usage": True}
+
+        logger.debug(f"Sending streaming request to vLLM API: {payload}")
+        try:
+            with self._post_completions(payload, stream=True) as response:
+                response.raise_for_status()
+
+                # Server-sent events: "data: {...}" lines terminated by "data: [DONE]"
+                for line in response.iter_lines():
+                    if not line.startswith(b"data: "):
+                        continue
+                    data = line[len(b"data: ") :]
+                    if data == b"[DONE]":
+                        break
+                    chunk = orjson.loads(data)
+                    if not chunk["choices"]:
+                        if chunk.get("usage"):
+                            logger.debug(f"vLLM completion usage: {chunk['usage']}")
+                        continue
+                    text = chunk["choices"][0]["text"]
+                    if text:
+                        yield text
+
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error calling vLLM API: {str(e)}")
+            self._ready_until = 0.0
+            raise
+
+    def generate_full(self, prompt: str, **kwargs) -> str:
+        """Generate text over the streaming endpoint and return the whole completion.
+
+        Args:
+            prompt: Input text prompt
+            **kwargs: Generation options passed to generate_stream()
+
+        Returns:
+            Generated text string
+        """
+        return "".join(self.generate_stream(prompt, **kwargs))
+
+    def generate_batch(
+        self,
+        prompts: List[str],
+        max_tokens: int = 512,
+        temperature: float = 0.7,
+        stop: Optional[List[str]] = None,
+        wait_if_starting: bool = True,
+        timeout: int = 60,
+        guided_json: Optional[Dict[str, Any]] = None,
+    ) -> List[str]:
+        """Generate completions for several prompts in a single request.
+
+        vLLM accepts a list of prompts and schedules them into the same decode
+        batch, so the total latency is close to that of the slowest prompt.
+
+        Args:
+            prompts: Input text prompts
+            max_tokens: Maximum tokens to generate per prompt
+            temperature: Sampling temperature
+            stop: Optional stop sequences
+            wait_if_starting: Whether to wait if server is still starting
+            timeout: How long to wait for server to be ready
+            guided_json: Optional JSON schema every output is constrained to
+
+        Returns:
+            Generated text strings in the same order as prompts
+        """
+        if not prompts:
+            return []
+
+        self._ensure_ready(wait_if_starting, timeout)
+
+        options = {
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stop": stop,
+            "guided_json": guided_json,
+        }
+        return self._complete(prompts, options)
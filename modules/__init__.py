@@ -2,3 +2,4 @@ from .qa_engine import QAEngine
 from .navigation import NavigationEngine
 from .summarization import SummarizationEngine
 from .quiz_generator import QuizGenerator
+from .prefetch import parallel_prepare
@@ -1,9 +1,13 @@
 import logging
-from typing import Dict, Any
+import threading
+from typing import Dict, List, Any
+
+import numpy as np
+from cachetools import LRUCache
 
 from ..llm.context_manager import ContextManager
 from ..llm.langchain_interface import LangchainInterface
-from ..storage import VideoDatabase, cached
+from ..storage import VideoDatabase, global_cache, success_ttl
 from ..utils.timestamp_parser import TimestampParser
 
 logger = logging.getLogger(__name__)
@@ -19,8 +23,10 @@ class NavigationEngine:
         self.context_manager = context_manager
         self.langchain = langchain
         self.timestamp_parser = TimestampParser()
+        # (video_id, lowercased search text) -> (transcript version, matches)
+        self._search_cache = LRUCache(maxsize=1024)
+        self._search_lock = threading.Lock()
 
-    @cached
     def navigate_to_position(self, video_id: str, query: str) -> Dict[str, Any]:
         """Navigate to a position in the video based on natural language query."""
         logger.info(f"Processing navigation query for video {video_id}: {query}")
@@ -39,6 +45,12 @@ class NavigationEngine:
                     "success": True,
                 }
 
+            # Only the LLM path is worth caching, the direct timestamp path is cheaper than a lookup
+            cache_key = ("nav", video_id, query)
+            cached_result = global_cache.get(cache_key)
+            if cached_result is not None:
+                return cached_result
+
             # If no direct timestamp, prepare context for LLM
             context = self.context_manager.prepare_navigation_context(query, video_id)
 
@@ -49,7 +61,7 @@ class NavigationEngine:
             timestamp_str = nav_result.get("timestamp", "0:00")
             seconds = self.timestamp_parser.parse_timestamp(timestamp_str)
 
-            return {
+            result = {
                 "video_id": video_id,
                 "query": query,
                 "position": seconds,
@@ -57,6 +69,8 @@ class NavigationEngine:
                 "reason": nav_result.get("reason", "No specific reason provided"),
                 "success": True,
             }
+            global_cache.set(cache_key, result, ttl=success_ttl(result))
+            return result
 
         except Exception as e:
             logger.error(f"Error in navigation engine: {str(e)}")
@@ -72,9 +86,9 @@ class NavigationEngine:
     def search_transcript(self, video_id: str, search_text: str) -> Dict[str, Any]:
         """Search for text in transcript and return matching segments."""
         try:
-            # Get transcript
-            full_transcript, segments = self.db.get_transcript(video_id)
-            if not segments:
+            # Cached until the video is re-ingested, only needed to tell "no transcript" apart
+            transcript = self.context_manager.get_transcript(video_id)
+            if not len(transcript):
                 return {
                     "video_id": video_id,
                     "search_text": search_text,
@@ -83,8 +97,17 @@ class NavigationEngine:
                     "error": "No transcript available for this video",
                 }
 
-            # Search for text in segments
-            matches = self.timestamp_parser.find_text_in_segments(segments, search_text)
+            # Search for text in segments, reusing results for repeated searches
+            version = self.db.get_transcript_version(video_id)
+            key = (video_id, search_text.lower())
+            with self._search_lock:
+                cached = self._search_cache.get(key)
+            if cached is not None and cached[0] == version:
+                matches = cached[1]
+            else:
+                matches = self._find_matches(video_id, search_text)
+                with self._search_lock:
+                    self._search_cache[key] = (version, matches)
 
             return {
                 "video_id": video_id,
@@ -102,3 +125,19 @@ class NavigationEngine:
                 "success": False,
                 "error": str(e),
             }
+
+    def _find_matches(self, video_id: str, search_text: str) -> List[Dict[str, Any]]:
+        """Find the segments of a video containing the search text with the full-text index."""
+        segments = self.db.search_segments(video_id, search_text)
+        timestamps = self.timestamp_parser.format_timestamps_bulk(
+            np.array([segment["start"] for segment in segments], dtype=np.float64)
+        )
+        return [
+            {
+                "start": round(segment["start"], 3),
+                "end": round(segment["end"], 3),
+                "text": segment["text"],
+                "timestamp": timestamp,
+            }
+            for segment, timestamp in zip(segments, timestamps)
+        ]
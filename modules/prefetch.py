@@ -0,0 +1,32 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any
+
+from ..llm.context_manager import ContextManager
+from ..storage import VideoDatabase, global_cache
+
+logger = logging.getLogger(__name__)
+
+# The page loads below are independent database reads, run them side by side
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="prefetch")
+
+
+def parallel_prepare(
+    db: VideoDatabase, context_manager: ContextManager, video_id: str
+) -> Dict[str, Any]:
+    """Fetch the stored summary and quiz of a video and warm its transcript concurrently."""
+    # Concurrent page loads for the same video share one round of reads
+    with global_cache.key_lock(("parallel_prepare", video_id)):
+        summary_future = _executor.submit(db.get_summary, video_id)
+        quiz_future = _executor.submit(db.get_quiz, video_id)
+        transcript_future = _executor.submit(context_manager.preload, video_id)
+
+        result = {
+            "video_id": video_id,
+            "summary": summary_future.result(),
+            "quiz": quiz_future.result(),
+            "transcript_segments": transcript_future.result(),
+        }
+
+    logger.info(f"Prepared video {video_id} ({result['transcript_segments']} segments)")
+    return result
@@ -2,8 +2,8 @@ import logging
 from typing import Dict, Any
 
 from ..llm.context_manager import ContextManager
-from ..llm.langchain_interface import LangchainInterface
-from ..storage import VideoDatabase, cached
+from ..llm.langchain_interface import ANSWER_ERROR_MESSAGE, LangchainInterface
+from ..storage import VideoDatabase, cached, success_ttl
 
 logger = logging.getLogger(__name__)
 
@@ -18,17 +18,29 @@ class QAEngine:
         self.context_manager = context_manager
         self.langchain = langchain
 
-    @cached
+    @cached(ttl_policy=success_ttl)
     def answer_question(self, video_id: str, query: str) -> Dict[str, Any]:
         """Answer a question about a specific video."""
         logger.info(f"Processing question for video {video_id}: {query}")
 
         try:
             # Prepare context from video transcript
+            version = self.db.get_transcript_version(video_id)
             context = self.context_manager.prepare_context(query, video_id)
 
-            # Generate answer using LLM
-            answer = self.langchain.answer_question(query, context)
+            # Generate answer using LLM, cached answers of an older transcript are not reused
+            answer = self.langchain.answer_question(
+                query, context, video_id=video_id, transcript_version=version
+            )
+            if answer == ANSWER_ERROR_MESSAGE:
+                # Reported as a failure so the cache only keeps it briefly
+                return {
+                    "video_id": video_id,
+                    "query": query,
+                    "answer": answer,
+                    "success": False,
+                    "error": "LLM generation failed",
+                }
 
             return {"video_id": video_id, "query": query, "answer": answer, "success": True}
 
@@ -1,13 +1,27 @@
 import logging
 from typing import Dict, List, Any
 
+import msgspec
+
 from ..llm.context_manager import ContextManager
 from ..llm.langchain_interface import LangchainInterface
-from ..storage import VideoDatabase, cached
+from ..storage import VideoDatabase, cached, success_ttl
 
 logger = logging.getLogger(__name__)
 
 
+class QuizItem(msgspec.Struct):
+    """A quiz question as returned by the LLM, extra fields are ignored.
+
+    Values are loosely typed, e.g. numeric options of math questions, and are
+    coerced by QuizGenerator._validate_quiz_data.
+    """
+
+    question: Any
+    options: List[Any]
+    correctAnswerIndex: Any
+
+
 class QuizGenerator:
     """Generates quizzes based on video content."""
 
@@ -36,13 +50,14 @@ class QuizGenerator:
 
         # Generate new quiz
         try:
-            return self._generate_quiz(video_id)
+            # Regenerating bypasses both the result cache and the LLM completion cache
+            return self._generate_quiz(video_id, no_cache=regenerate, skip_cache=regenerate)
         except Exception as e:
             logger.error(f"Error generating quiz: {str(e)}")
             return {"video_id": video_id, "questions": [], "success": False, "error": str(e)}
 
-    @cached
-    def _generate_quiz(self, video_id: str) -> Dict[str, Any]:
+    @cached(ttl_policy=success_ttl)
+    def _generate_quiz(self, video_id: str, no_cache: bool = False) -> Dict[str, Any]:
         """Generate a quiz for a video."""
         logger.info(f"Generating new quiz for video {video_id}")
 
@@ -51,10 +66,18 @@ class QuizGenerator:
             context = self.context_manager.prepare_quiz_context(video_id)
 
             # Generate quiz using LLM
-            quiz_data = self.langchain.generate_quiz(context)
+            quiz_data = self.langchain.generate_quiz(context, video_id=video_id, no_cache=no_cache)
 
             # Validate quiz data
             validated_quiz = self._validate_quiz_data(quiz_data)
+            if not validated_quiz:
+                # The LLM call failed or produced nothing usable, don't save an empty quiz
+                return {
+                    "video_id": video_id,
+                    "questions": [],
+                    "success": False,
+                    "error": "No valid quiz questions were generated",
+                }
 
             # Save quiz to database
             self.db.save_quiz(video_id, validated_quiz)
@@ -71,30 +94,29 @@ class QuizGenerator:
 
     def _validate_quiz_data(self, quiz_data: List[Dict]) -> List[Dict]:
         """Validate and clean up quiz data."""
-        validated_quiz = []
-
-        for item in quiz_data:
-            if not isinstance(item, dict):
-                continue
-
-            if "question" not in item or "options" not in item or "correctAnswerIndex" not in item:
-                continue
-
-            if not isinstance(item["options"], list) or len(item["options"]) < 2:
-                continue
-
-            if not isinstance(item["correctAnswerIndex"], int) or item["correctAnswerIndex"] >= len(
-                item["options"]
-            ):
-                # Fix the index if it's out of bounds
-                item["correctAnswerIndex"] = 0
-
-            validated_quiz.append(
-                {
-                    "question": str(item["question"]),
-                    "options": [str(opt) for opt in item["options"]],
-                    "correctAnswerIndex": item["correctAnswerIndex"],
-                }
-            )
-
-        return validated_quiz
+        try:
+            items = msgspec.convert(quiz_data, List[QuizItem])
+        except msgspec.ValidationError:
+            # Drop only the malformed questions
+            items = []
+            for item in quiz_data if isinstance(quiz_data, list) else []:
+                try:
+                    items.append(msgspec.convert(item, QuizItem))
+                except msgspec.ValidationError:
+                    continue
+
+        return [
+            {
+                "question": str(item.question),
+                "options": [str(option) for option in item.options],
+                # Fix the index if it's not an int or out of bounds
+                "correctAnswerIndex": (
+                    item.correctAnswerIndex
+                    if isinstance(item.correctAnswerIndex, int)
+                    and 0 <= item.correctAnswerIndex < len(item.options)
+                    else 0
+                ),
+            }
+            for item in items
+            if len(item.options) >= 2
+        ]
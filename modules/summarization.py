@@ -2,8 +2,8 @@ import logging
 from typing import Dict, Any
 
 from ..llm.context_manager import ContextManager
-from ..llm.langchain_interface import LangchainInterface
-from ..storage import VideoDatabase, cached
+from ..llm.langchain_interface import SUMMARY_ERROR_MESSAGE, LangchainInterface
+from ..storage import VideoDatabase, cached, success_ttl
 
 logger = logging.getLogger(__name__)
 
@@ -36,7 +36,8 @@ class SummarizationEngine:
 
         # Generate new summary
         try:
-            return self._generate_summary(video_id)
+            # Regenerating bypasses both the result cache and the LLM completion cache
+            return self._generate_summary(video_id, no_cache=regenerate, skip_cache=regenerate)
         except Exception as e:
             logger.error(f"Error generating summary: {str(e)}")
             return {
@@ -46,8 +47,8 @@ class SummarizationEngine:
                 "error": str(e),
             }
 
-    @cached
-    def _generate_summary(self, video_id: str) -> Dict[str, Any]:
+    @cached(ttl_policy=success_ttl)
+    def _generate_summary(self, video_id: str, no_cache: bool = False) -> Dict[str, Any]:
         """Generate a summary for a video."""
         logger.info(f"Generating new summary for video {video_id}")
 
@@ -56,7 +57,15 @@ class SummarizationEngine:
             context = self.context_manager.prepare_summary_context(video_id)
 
             # Generate summary using LLM
-            summary = self.langchain.generate_summary(context)
+            summary = self.langchain.generate_summary(context, video_id=video_id, no_cache=no_cache)
+            if summary == SUMMARY_ERROR_MESSAGE:
+                # Not saved, and reported as a failure so the cache only keeps it briefly
+                return {
+                    "video_id": video_id,
+                    "summary": "Summary generation failed due to an error.",
+                    "success": False,
+                    "error": "LLM generation failed",
+                }
 
             # Save summary to database
             self.db.save_summary(video_id, summary)
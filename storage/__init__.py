@@ -1,3 +1,4 @@
-from .database import VideoDatabase
+from .database import VideoDatabase, Transcript
 from .vector_store import VideoVectorStore
-from .cache import global_cache, cached
+from .cache import global_cache, cached, success_ttl
+from .semantic_cache import SemanticCache
@@ -1,71 +1,218 @@
 import time
-from typing import Dict, Any, Optional, Callable
+import inspect
 import logging
-import json
 import hashlib
+import threading
+import weakref
+from typing import Dict, Any, Optional, Callable, Hashable, Tuple
 from functools import wraps
 
-from ..config import CACHE_EXPIRY
+import diskcache
+import msgpack
+from cachetools import TLRUCache
+
+from ..config import CACHE_EXPIRY, CACHE_FAILURE_TTL, CACHE_DIR
 
 logger = logging.getLogger(__name__)
 
 
-class Cache:
-    """Simple in-memory cache with expiration."""
+class _KeyLock:
+    """Lock for a single cache key, weak-referenceable so idle keys are dropped."""
 
-    def __init__(self, expiry_time: int = CACHE_EXPIRY):
-        self.cache: Dict[str, Dict[str, Any]] = {}
-        self.expiry_time = expiry_time
+    __slots__ = ("_lock", "__weakref__")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self._lock.acquire()
+        return self
 
-    def _generate_key(self, *args, **kwargs) -> str:
-        """Generate a cache key from args and kwargs."""
-        key_parts = [str(arg) for arg in args]
-        key_parts.extend([f"{k}:{v}" for k, v in sorted(kwargs.items())])
-        key_string = json.dumps(key_parts)
-        return hashlib.md5(key_string.encode()).hexdigest()
-
-    def get(self, key: str) -> Optional[Any]:
-        """Get value from cache if it exists and hasn't expired."""
-        if key in self.cache:
-            item = self.cache[key]
-            if item["expiry"] > time.time():
-                logger.debug(f"Cache hit for key: {key}")
-                return item["value"]
-            else:
-                # Remove expired item
-                logger.debug(f"Cache expired for key: {key}")
-                del self.cache[key]
-        return None
-
-    def set(self, key: str, value: Any) -> None:
-        """Set value in cache with expiration."""
-        self.cache[key] = {"value": value, "expiry": time.time() + self.expiry_time}
-        logger.debug(f"Added to cache: {key}")
+    def __exit__(self, *exc_info):
+        self._lock.release()
+
+
+def _stable_repr(value: Any) -> str:
+    """Represent a key part identically across processes, objects by their class name."""
+    if value is None or isinstance(value, (str, bytes, int, float, bool)):
+        return repr(value)
+    if isinstance(value, (tuple, list)):
+        return "(" + ",".join(_stable_repr(item) for item in value) + ")"
+    if isinstance(value, dict):
+        items = (f"{_stable_repr(k)}:{_stable_repr(v)}" for k, v in value.items())
+        return "{" + ",".join(items) + "}"
+    # e.g. the engine instance bound to a cached method
+    return type(value).__qualname__
+
+
+class Cache:
+    """Bounded in-memory cache with expiration, backed by a persistent on-disk cache.
+
+    The on-disk level survives restarts, so previously generated results are
+    served without calling the LLM again.
+    """
+
+    def __init__(
+        self,
+        expiry_time: int = CACHE_EXPIRY,
+        maxsize: int = 10_000,
+        disk_path: Optional[str] = CACHE_DIR,
+    ):
+        # Entries are stored as (value, ttl) so each one can expire on its own schedule,
+        # measured on the monotonic clock so wall clock jumps don't expire or revive them
+        self.cache = TLRUCache(
+            maxsize=maxsize, ttu=lambda key, item, now: now + item[1], timer=time.monotonic
+        )
+        self.expiry_time = expiry_time
+        self.disk_path = disk_path
+        self._disk: Optional[diskcache.Cache] = None
+        # @cached functions are called from several request threads, no method re-enters
+        self._lock = threading.Lock()
+        # Locks of keys currently being computed, released once no caller holds them
+        self._key_locks: "weakref.WeakValueDictionary[Hashable, _KeyLock]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    def key_lock(self, key: Hashable) -> _KeyLock:
+        """Return the lock serializing computation of ``key``."""
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = _KeyLock()
+                self._key_locks[key] = lock
+        return lock
+
+    def _get_disk(self) -> Optional[diskcache.Cache]:
+        """Return the on-disk cache, opening it on first use."""
+        if self._disk is None and self.disk_path is not None:
+            with self._lock:
+                if self._disk is None:
+                    self._disk = diskcache.Cache(directory=self.disk_path)
+        return self._disk
+
+    @staticmethod
+    def _disk_key(key: Hashable) -> bytes:
+        """Hash a key into a compact digest that is stable across processes."""
+        return hashlib.blake2b(_stable_repr(key).encode(), digest_size=16).digest()
+
+    def get(self, key: Hashable, disk_key: Optional[Hashable] = None) -> Optional[Any]:
+        """Get value from cache if it exists and hasn't expired.
+
+        ``disk_key`` identifies the value on disk when ``key`` depends on the process,
+        it defaults to ``key``.
+        """
+        with self._lock:
+            item = self.cache.get(key)
+        if item is not None:
+            logger.debug(f"Cache hit for key: {key}")
+            return item[0]
+
+        disk = self._get_disk()
+        if disk is None:
+            return None
+
+        # diskcache expiry is wall clock time since it has to survive restarts
+        if disk_key is None:
+            disk_key = key
+        packed, expire_time = disk.get(self._disk_key(disk_key), expire_time=True)
+        if packed is None:
+            return None
+
+        value = msgpack.unpackb(packed, raw=False)
+        ttl = expire_time - time.time() if expire_time is not None else self.expiry_time
+        if ttl > 0:
+            with self._lock:
+                self.cache[key] = (value, ttl)
+        logger.debug(f"Disk cache hit for key: {key}")
+        return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        disk_key: Optional[Hashable] = None,
+    ) -> None:
+        """Set value in cache with expiration, ``ttl`` overrides the default expiry time."""
+        if ttl is None:
+            ttl = self.expiry_time
+        if ttl <= 0:
+            return
+        with self._lock:
+            self.cache[key] = (value, ttl)
+
+        disk = self._get_disk()
+        if disk is not None:
+            if disk_key is None:
+                disk_key = key
+            try:
+                packed = msgpack.packb(value, use_bin_type=True)
+                disk.set(self._disk_key(disk_key), packed, expire=ttl)
+            except TypeError:
+                # Not representable in msgpack, keep it in memory only
+                pass
+        logger.debug(f"Added to cache for {ttl}s: {key}")
 
     def clear(self) -> None:
         """Clear all items from cache."""
-        self.cache.clear()
+        with self._lock:
+            self.cache.clear()
+        disk = self._get_disk()
+        if disk is not None:
+            disk.clear()
         logger.info("Cache cleared")
 
     def remove_expired(self) -> int:
         """Remove all expired items from cache. Returns count of removed items."""
-        now = time.time()
-        expired_keys = [k for k, v in self.cache.items() if v["expiry"] <= now]
-        for key in expired_keys:
-            del self.cache[key]
+        with self._lock:
+            expired = self.cache.expire()
+        disk = self._get_disk()
+        if disk is not None:
+            disk.expire()
 
-        if expired_keys:
-            logger.debug(f"Removed {len(expired_keys)} expired items from cache")
+        if expired:
+            logger.debug(f"Removed {len(expired)} expired items from cache")
 
-        return len(expired_keys)
+        return len(expired)
 
 
 # Create a global cache instance
 global_cache = Cache()
 
 
-def cached(func: Callable) -> Callable:
-    """Decorator to cache function results."""
+def _make_key(func_name: str, args: Tuple, kwargs: Dict[str, Any]) -> Hashable:
+    """Build an in-process cache key, the arguments are hashed directly as a tuple."""
+    key = (func_name, args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        # Unhashable argument (e.g. a list), fall back to its representation
+        key = (func_name, repr(args), repr(sorted(kwargs.items())))
+    return key
+
+
+def success_ttl(result: Any) -> float:
+    """TTL policy caching failed results briefly so transient errors are retried soon."""
+    if isinstance(result, dict) and not result.get("success"):
+        return CACHE_FAILURE_TTL
+    return CACHE_EXPIRY
+
+
+def cached(
+    func: Optional[Callable] = None, *, ttl_policy: Optional[Callable[[Any], float]] = None
+) -> Callable:
+    """Decorator to cache function results.
+
+    Use as ``@cached`` or ``@cached(ttl_policy=...)``, where ``ttl_policy`` maps a
+    result to the number of seconds it should stay cached (0 to not cache it).
+    """
+    if func is None:
+        return lambda f: cached(f, ttl_policy=ttl_policy)
+
+    # The instance a method is bound to only exists in this process, leave it out of
+    # the on-disk key, which is built from the remaining argument values
+    func_id = f"{func.__module__}.{func.__qualname__}"
+    is_method = next(iter(inspect.signature(func).parameters), None) == "self"
 
     @wraps(func)
     def wrapper(*args, **kwargs):
@@ -76,16 +223,24 @@ def cached(func: Callable) -> Callable:
             return func(*args, **kwargs)
 
         # Generate cache key
-        cache_key = global_cache._generate_key(func.__name__, *args, **kwargs)
+        cache_key = _make_key(func.__name__, args, kwargs)
+        disk_key = (func_id, args[1:] if is_method else args, sorted(kwargs.items()))
 
         # Try to get from cache
-        result = global_cache.get(cache_key)
+        result = global_cache.get(cache_key, disk_key=disk_key)
         if result is not None:
             return result
 
-        # Execute function and store result
-        result = func(*args, **kwargs)
-        global_cache.set(cache_key, result)
-        return result
+        # Single-flight: concurrent callers of the same key wait for the first one
+        with global_cache.key_lock(cache_key):
+            result = global_cache.get(cache_key, disk_key=disk_key)
+            if result is not None:
+                return result
+
+            # Execute function and store result
+            result = func(*args, **kwargs)
+            ttl = ttl_policy(result) if ttl_policy is not None else None
+            global_cache.set(cache_key, result, ttl=ttl, disk_key=disk_key)
+            return result
 
     return wrapper
@@ -1,82 +1,332 @@
-import json
+import queue
 import logging
 import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from ..config import DB_PATH
+import numpy as np
+import orjson
+import zstandard
+
+from ..config import DB_PATH, ensure_dirs
 
 logger = logging.getLogger(__name__)
 
+# Applied to every connection; WAL itself is persisted in the database file
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+)
+
+# Seconds a reader waits for a free connection before re-checking whether the pool is closed
+_READER_WAIT = 1.0
+
+# Segment and quiz JSON repeats the same keys in every item and compresses very well
+_COMPRESSOR = zstandard.ZstdCompressor(level=3)
+_DECOMPRESSOR = zstandard.ZstdDecompressor()
+
+
+def _pack(obj) -> bytes:
+    """Serialize to zstd-compressed JSON."""
+    return _COMPRESSOR.compress(orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY))
+
+
+def _unpack(value):
+    """Deserialize a value written by _pack, or plain JSON text from older rows."""
+    if isinstance(value, bytes):
+        value = _DECOMPRESSOR.decompress(value)
+    return orjson.loads(value)
+
+
+_INSERT_TRANSCRIPT_SQL = (
+    "INSERT INTO transcripts (video_id, full_transcript, segments, created_at) VALUES (?, ?, ?, ?)"
+)
+_INSERT_SEGMENT_SQL = (
+    "INSERT INTO segments (video_id, idx, start_time, end_time, text) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+_EMPTY_SEGMENTS = _pack([])
+
+# The trigram tokenizer only matches queries of at least three characters
+_FTS_MIN_QUERY_LENGTH = 3
+
+
+@dataclass
+class Transcript:
+    """Transcript segments stored as parallel arrays (struct of arrays)."""
+
+    __slots__ = ("full_transcript", "texts", "starts", "ends", "_search_text", "_offsets")
+
+    full_transcript: str
+    texts: np.ndarray  # object array of segment texts
+    starts: np.ndarray  # float32 segment start times in seconds
+    ends: np.ndarray  # float32 segment end times in seconds
+
+    def __post_init__(self):
+        # Lowercased segment texts joined into one buffer, built on first search
+        self._search_text: Optional[str] = None
+        self._offsets: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_segments(cls, full_transcript: str, segments: List[Dict]) -> "Transcript":
+        """Build a Transcript from a list of {"start", "end", "text"} segment dicts."""
+        return cls(
+            full_transcript=full_transcript,
+            texts=np.array([segment["text"] for segment in segments], dtype=object),
+            starts=np.array([segment["start"] for segment in segments], dtype=np.float32),
+            ends=np.array([segment["end"] for segment in segments], dtype=np.float32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def search(self, query: str) -> List[int]:
+        """Return the indices of segments containing ``query``, case-insensitively.
+
+        All segments are scanned as a single buffer with ``str.find``, match
+        positions are mapped back to segments through their start offsets.
+        """
+        search_text = self._search_text
+        if search_text is None:
+            lowered = [text.lower() for text in self.texts]
+            lengths = np.fromiter((len(text) + 1 for text in lowered), np.int32, len(lowered))
+            # NUL separators keep matches from spanning two segments
+            search_text = "\0".join(lowered)
+            # Transcripts are shared between threads through caches, publish the offsets
+            # before the buffer so a reader never sees the buffer without them
+            self._offsets = np.cumsum(lengths) - lengths
+            self._search_text = search_text
+        offsets = self._offsets
+
+        query = query.lower()
+        if not query:
+            return list(range(len(self)))
+        if "\0" in query:
+            return []
+
+        matches = []
+        position = search_text.find(query)
+        while position != -1:
+            index = int(np.searchsorted(offsets, position, side="right")) - 1
+            matches.append(index)
+            if index + 1 >= len(self):
+                break
+            position = search_text.find(query, int(offsets[index + 1]))
+        return matches
+
+
+class _SqlitePool:
+    """Single writer, many readers pool of long-lived SQLite connections.
+
+    Connections keep their page cache across queries instead of reopening the
+    file for every statement; WAL mode lets the readers run alongside the writer.
+    """
+
+    def __init__(self, db_path: str, readers: int = 4):
+        self.db_path = db_path
+        self._writer = self._connect()
+        # Readers no longer block the writer, and commits skip most fsyncs
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._write_lock = threading.Lock()
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(readers):
+            self._readers.put(self._connect())
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with the tuned PRAGMAs applied."""
+        # Connections are handed between threads, but only ever used by one at a time
+        conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        # SQLite's lower() only folds ASCII, match the Unicode folding of the trigram index
+        conn.create_function("unicode_lower", 1, str.lower, deterministic=True)
+        return conn
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Cursor]:
+        """Check out a reader connection and yield a cursor on it."""
+        while True:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+            try:
+                # Wake up periodically so a close() while waiting is noticed
+                conn = self._readers.get(timeout=_READER_WAIT)
+                break
+            except queue.Empty:
+                continue
+        try:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+        finally:
+            if self._closed:
+                # close() already drained the queue, nobody else will close this one
+                conn.close()
+            else:
+                self._readers.put(conn)
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Cursor]:
+        """Yield a cursor on the writer connection inside a transaction."""
+        with self._write_lock:
+            cursor = self._writer.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                try:
+                    yield cursor
+                except BaseException:
+                    cursor.execute("ROLLBACK")
+                    raise
+                cursor.execute("COMMIT")
+            finally:
+                cursor.close()
+
+    def close(self) -> None:
+        """Close all pooled connections, waiting for an in-flight write to finish.
+
+        Readers checked out at this point are closed when they are returned.
+        """
+        self._closed = True
+        with self._write_lock:
+            self._writer.close()
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+
 
 class VideoDatabase:
     def __init__(self, db_path: str = DB_PATH):
         """Initialize database connection."""
         self.db_path = db_path
+        ensure_dirs()
+        self._pool = _SqlitePool(db_path)
         self._create_tables()
 
+    def close(self) -> None:
+        """Close the database connections."""
+        self._pool.close()
+
     def _create_tables(self):
         """Create necessary tables if they don't exist."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._pool.write() as cursor:
+            # Videos table
+            cursor.execute(
+                """
+            CREATE TABLE IF NOT EXISTS videos (
+                video_id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                uploaded_at TIMESTAMP NOT NULL,
+                duration REAL,
+                file_size REAL,
+                thumbnail_path TEXT
+            )
+            """
+            )
 
-        # Videos table
-        cursor.execute(
+            # Transcripts table
+            cursor.execute(
+                """
+            CREATE TABLE IF NOT EXISTS transcripts (
+                transcript_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                video_id TEXT NOT NULL,
+                full_transcript TEXT NOT NULL,
+                segments BLOB NOT NULL, -- zstd compressed JSON segments with timestamps
+                created_at TIMESTAMP NOT NULL,
+                FOREIGN KEY (video_id) REFERENCES videos (video_id)
+            )
             """
-        CREATE TABLE IF NOT EXISTS videos (
-            video_id TEXT PRIMARY KEY,
-            title TEXT NOT NULL,
-            file_path TEXT NOT NULL,
-            uploaded_at TIMESTAMP NOT NULL,
-            duration REAL,
-            file_size REAL,
-            thumbnail_path TEXT
-        )
-        """
-        )
+            )
 
-        # Transcripts table
-        cursor.execute(
+            # Summaries table
+            cursor.execute(
+                """
+            CREATE TABLE IF NOT EXISTS summaries (
+                summary_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                video_id TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                created_at TIMESTAMP NOT NULL,
+                FOREIGN KEY (video_id) REFERENCES videos (video_id)
+            )
             """
-        CREATE TABLE IF NOT EXISTS transcripts (
-            transcript_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            video_id TEXT NOT NULL,
-            full_transcript TEXT NOT NULL,
-            segments TEXT NOT NULL, -- JSON serialized segments with timestamps
-            created_at TIMESTAMP NOT NULL,
-            FOREIGN KEY (video_id) REFERENCES videos (video_id)
-        )
-        """
-        )
+            )
 
-        # Summaries table
-        cursor.execute(
+            # Quizzes table
+            cursor.execute(
+                """
+            CREATE TABLE IF NOT EXISTS quizzes (
+                quiz_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                video_id TEXT NOT NULL,
+                quiz_data BLOB NOT NULL, -- zstd compressed JSON quiz questions and answers
+                created_at TIMESTAMP NOT NULL,
+                FOREIGN KEY (video_id) REFERENCES videos (video_id)
+            )
             """
-        CREATE TABLE IF NOT EXISTS summaries (
-            summary_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            video_id TEXT NOT NULL,
-            summary TEXT NOT NULL,
-            created_at TIMESTAMP NOT NULL,
-            FOREIGN KEY (video_id) REFERENCES videos (video_id)
-        )
-        """
-        )
+            )
 
-        # Quizzes table
-        cursor.execute(
+            # Segments of each video's latest transcript as one row each (struct of arrays)
+            cursor.execute(
+                """
+            CREATE TABLE IF NOT EXISTS segments (
+                id INTEGER PRIMARY KEY, -- stable rowid the full-text index points at
+                video_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                start_time REAL NOT NULL,
+                end_time REAL NOT NULL,
+                text TEXT NOT NULL,
+                UNIQUE (video_id, idx)
+            )
             """
-        CREATE TABLE IF NOT EXISTS quizzes (
-            quiz_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            video_id TEXT NOT NULL,
-            quiz_data TEXT NOT NULL, -- JSON serialized quiz questions and answers
-            created_at TIMESTAMP NOT NULL,
-            FOREIGN KEY (video_id) REFERENCES videos (video_id)
-        )
-        """
-        )
+            )
 
-        conn.commit()
-        conn.close()
+            # Trigram full-text index over segment texts for substring search
+            try:
+                cursor.execute(
+                    """
+                CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+                    text, content='segments', content_rowid='id', tokenize='trigram'
+                )
+                """
+                )
+                cursor.execute(
+                    """
+                CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+                    INSERT INTO segments_fts (rowid, text) VALUES (new.id, new.text);
+                END
+                """
+                )
+                cursor.execute(
+                    """
+                CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+                    INSERT INTO segments_fts (segments_fts, rowid, text)
+                    VALUES ('delete', old.id, old.text);
+                END
+                """
+                )
+                self._fts = True
+            except sqlite3.OperationalError as e:
+                # SQLite built without FTS5 or older than 3.34, search falls back to a scan
+                logger.warning(f"Full-text search unavailable: {str(e)}")
+                self._fts = False
+
+            # Every getter fetches the latest row per video, serve it with an index seek.
+            # Rows saved in one batch share created_at, so the latest is the highest id,
+            # which an index on video_id already orders by
+            for table in ("transcripts", "summaries", "quizzes"):
+                cursor.execute(f"DROP INDEX IF EXISTS idx_{table}_video_created")
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{table}_video ON {table} (video_id)"
+                )
 
     def add_video(
         self,
@@ -88,106 +338,227 @@ class VideoDatabase:
         thumbnail_path: Optional[str] = None,
     ) -> str:
         """Add a new video to the database."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         try:
-            cursor.execute(
-                """INSERT INTO videos (video_id, title, file_path, uploaded_at, duration, file_size, thumbnail_path) 
-                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                (video_id, title, file_path, datetime.now(), duration, file_size, thumbnail_path),
-            )
-            conn.commit()
+            with self._pool.write() as cursor:
+                cursor.execute(
+                    """INSERT INTO videos (video_id, title, file_path, uploaded_at, duration, file_size, thumbnail_path) 
+                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    (
+                        video_id,
+                        title,
+                        file_path,
+                        datetime.now(),
+                        duration,
+                        file_size,
+                        thumbnail_path,
+                    ),
+                )
             logger.info(f"Added video {title} with ID {video_id}")
             return video_id
         except Exception as e:
-            conn.rollback()
             logger.error(f"Error adding video: {str(e)}")
             raise
-        finally:
-            conn.close()
 
     def save_transcript(self, video_id: str, full_transcript: str, segments: List[Dict]) -> int:
         """Save transcript for a video."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return self.save_transcripts_bulk([(video_id, full_transcript, segments)])[0]
+
+    def save_transcripts_bulk(self, rows: List[Tuple[str, str, List[Dict]]]) -> List[int]:
+        """Save (video_id, full_transcript, segments) rows in a single transaction.
+
+        Returns:
+            The transcript ids, in the same order as rows
+        """
+        if not rows:
+            return []
 
         try:
-            cursor.execute(
-                """INSERT INTO transcripts (video_id, full_transcript, segments, created_at)
-                   VALUES (?, ?, ?, ?)""",
-                (video_id, full_transcript, json.dumps(segments), datetime.now()),
-            )
-            transcript_id = cursor.lastrowid
-            conn.commit()
-            logger.info(f"Saved transcript for video {video_id}")
-            return transcript_id
+            now = datetime.now()
+            with self._pool.write() as cursor:
+                # One prepared statement, stepped once per row. Segments live in their own
+                # table, the JSON column only keeps rows written before it existed readable
+                cursor.executemany(
+                    _INSERT_TRANSCRIPT_SQL,
+                    [
+                        (video_id, full_transcript, _EMPTY_SEGMENTS, now)
+                        for video_id, full_transcript, _ in rows
+                    ],
+                )
+                # Writes hold the only writer connection, so AUTOINCREMENT ids are contiguous
+                last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+                # Only the latest transcript of a video keeps its segments
+                latest = {video_id: segments for video_id, _, segments in rows}
+                cursor.executemany(
+                    "DELETE FROM segments WHERE video_id = ?", [(video_id,) for video_id in latest]
+                )
+                cursor.executemany(
+                    _INSERT_SEGMENT_SQL,
+                    [
+                        (video_id, idx, segment["start"], segment["end"], segment["text"])
+                        for video_id, segments in latest.items()
+                        for idx, segment in enumerate(segments)
+                    ],
+                )
+            if len(rows) == 1:
+                logger.info(f"Saved transcript for video {rows[0][0]}")
+            else:
+                logger.info(f"Saved {len(rows)} transcripts")
+            return list(range(last_id - len(rows) + 1, last_id + 1))
         except Exception as e:
-            conn.rollback()
             logger.error(f"Error saving transcript: {str(e)}")
             raise
-        finally:
-            conn.close()
 
-    def get_transcript(self, video_id: str) -> Tuple[str, List[Dict]]:
-        """Get transcript for a video."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def get_transcript_version(self, video_id: str) -> int:
+        """Get a number that changes whenever a new transcript is saved for a video.
 
-        try:
+        Read from the database, so transcripts saved by other processes or instances
+        invalidate in-memory caches too. 0 if the video has no transcript.
+        """
+        with self._pool.read() as cursor:
+            # AUTOINCREMENT ids only grow, the latest id identifies the latest transcript
+            cursor.execute(
+                "SELECT MAX(transcript_id) FROM transcripts WHERE video_id = ?", (video_id,)
+            )
+            version = cursor.fetchone()[0]
+        return version or 0
+
+    def _fetch_transcript(self, video_id: str) -> Optional[Tuple[str, List[Tuple]]]:
+        """Fetch the latest transcript text and its (start, end, text) segment rows."""
+        with self._pool.read() as cursor:
             cursor.execute(
                 """SELECT full_transcript, segments FROM transcripts
-                   WHERE video_id = ? ORDER BY created_at DESC LIMIT 1""",
+                   WHERE video_id = ? ORDER BY transcript_id DESC LIMIT 1""",
                 (video_id,),
             )
             row = cursor.fetchone()
+            if not row:
+                return None
 
-            if row:
-                full_transcript, segments_json = row
-                return full_transcript, json.loads(segments_json)
+            cursor.execute(
+                """SELECT start_time, end_time, text FROM segments
+                   WHERE video_id = ? ORDER BY idx""",
+                (video_id,),
+            )
+            segment_rows = cursor.fetchall()
+
+        full_transcript, segments_json = row
+        if not segment_rows:
+            # Saved before the segments table existed
+            segment_rows = [
+                (segment["start"], segment["end"], segment["text"])
+                for segment in _unpack(segments_json)
+            ]
+        return full_transcript, segment_rows
+
+    def get_transcript(self, video_id: str) -> Tuple[str, List[Dict]]:
+        """Get transcript for a video."""
+        try:
+            transcript = self._fetch_transcript(video_id)
+            if transcript:
+                full_transcript, segment_rows = transcript
+                return full_transcript, [
+                    {"start": start, "end": end, "text": text}
+                    for start, end, text in segment_rows
+                ]
             else:
                 logger.warning(f"No transcript found for video {video_id}")
                 return "", []
         except Exception as e:
             logger.error(f"Error retrieving transcript: {str(e)}")
             return "", []
-        finally:
-            conn.close()
+
+    def get_transcript_arrays(self, video_id: str) -> Transcript:
+        """Get transcript for a video as a struct-of-arrays Transcript."""
+        try:
+            transcript = self._fetch_transcript(video_id)
+        except Exception as e:
+            logger.error(f"Error retrieving transcript: {str(e)}")
+            transcript = None
+        if not transcript:
+            return Transcript.from_segments("", [])
+
+        full_transcript, segment_rows = transcript
+        # Columns map straight onto the arrays, no intermediate segment dicts
+        starts, ends, texts = zip(*segment_rows) if segment_rows else ((), (), ())
+        return Transcript(
+            full_transcript=full_transcript,
+            texts=np.array(texts, dtype=object),
+            starts=np.array(starts, dtype=np.float32),
+            ends=np.array(ends, dtype=np.float32),
+        )
+
+    def search_segments(self, video_id: str, query: str) -> List[Dict]:
+        """Find the segments of a video containing ``query``, case-insensitively."""
+        try:
+            with self._pool.read() as cursor:
+                if self._fts and len(query) >= _FTS_MIN_QUERY_LENGTH:
+                    cursor.execute(
+                        """SELECT s.idx, s.start_time, s.end_time, s.text
+                           FROM segments_fts f JOIN segments s ON s.id = f.rowid
+                           WHERE segments_fts MATCH ? AND s.video_id = ?
+                           ORDER BY s.idx""",
+                        ('"' + query.replace('"', '""') + '"', video_id),
+                    )
+                else:
+                    cursor.execute(
+                        """SELECT idx, start_time, end_time, text FROM segments
+                           WHERE video_id = ? AND instr(unicode_lower(text), ?) > 0
+                           ORDER BY idx""",
+                        (video_id, query.lower()),
+                    )
+                rows = cursor.fetchall()
+                if not rows:
+                    cursor.execute("SELECT 1 FROM segments WHERE video_id = ? LIMIT 1", (video_id,))
+                    legacy = cursor.fetchone() is None
+
+            if not rows and legacy:
+                # Saved before the segments table existed, search the JSON segments in memory
+                transcript = self.get_transcript_arrays(video_id)
+                rows = [
+                    (
+                        index,
+                        float(transcript.starts[index]),
+                        float(transcript.ends[index]),
+                        transcript.texts[index],
+                    )
+                    for index in transcript.search(query)
+                ]
+
+            return [
+                {"idx": idx, "start": start, "end": end, "text": text}
+                for idx, start, end, text in rows
+            ]
+        except Exception as e:
+            logger.error(f"Error searching segments: {str(e)}")
+            return []
 
     def save_summary(self, video_id: str, summary: str) -> int:
         """Save summary for a video."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         try:
-            cursor.execute(
-                """INSERT INTO summaries (video_id, summary, created_at)
-                   VALUES (?, ?, ?)""",
-                (video_id, summary, datetime.now()),
-            )
-            summary_id = cursor.lastrowid
-            conn.commit()
+            with self._pool.write() as cursor:
+                cursor.execute(
+                    """INSERT INTO summaries (video_id, summary, created_at)
+                       VALUES (?, ?, ?)""",
+                    (video_id, summary, datetime.now()),
+                )
+                summary_id = cursor.lastrowid
             logger.info(f"Saved summary for video {video_id}")
             return summary_id
         except Exception as e:
-            conn.rollback()
             logger.error(f"Error saving summary: {str(e)}")
             raise
-        finally:
-            conn.close()
 
     def get_summary(self, video_id: str) -> str:
         """Get summary for a video."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         try:
-            cursor.execute(
-                """SELECT summary FROM summaries
-                   WHERE video_id = ? ORDER BY created_at DESC LIMIT 1""",
-                (video_id,),
-            )
-            row = cursor.fetchone()
+            with self._pool.read() as cursor:
+                cursor.execute(
+                    """SELECT summary FROM summaries
+                       WHERE video_id = ? ORDER BY summary_id DESC LIMIT 1""",
+                    (video_id,),
+                )
+                row = cursor.fetchone()
 
             if row:
                 return row[0]
@@ -197,73 +568,66 @@ class VideoDatabase:
         except Exception as e:
             logger.error(f"Error retrieving summary: {str(e)}")
             return ""
-        finally:
-            conn.close()
 
     def save_quiz(self, video_id: str, quiz_data: List[Dict]) -> int:
         """Save quiz for a video."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         try:
-            cursor.execute(
-                """INSERT INTO quizzes (video_id, quiz_data, created_at)
-                   VALUES (?, ?, ?)""",
-                (video_id, json.dumps(quiz_data), datetime.now()),
-            )
-            quiz_id = cursor.lastrowid
-            conn.commit()
+            with self._pool.write() as cursor:
+                cursor.execute(
+                    """INSERT INTO quizzes (video_id, quiz_data, created_at)
+                       VALUES (?, ?, ?)""",
+                    (video_id, _pack(quiz_data), datetime.now()),
+                )
+                quiz_id = cursor.lastrowid
             logger.info(f"Saved quiz for video {video_id}")
             return quiz_id
         except Exception as e:
-            conn.rollback()
             logger.error(f"Error saving quiz: {str(e)}")
             raise
-        finally:
-            conn.close()
 
     def get_quiz(self, video_id: str) -> List[Dict]:
         """Get quiz for a video."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         try:
-            cursor.execute(
-                """SELECT quiz_data FROM quizzes
-                   WHERE video_id = ? ORDER BY created_at DESC LIMIT 1""",
-                (video_id,),
-            )
-            row = cursor.fetchone()
+            with self._pool.read() as cursor:
+                cursor.execute(
+                    """SELECT quiz_data FROM quizzes
+                       WHERE video_id = ? ORDER BY quiz_id DESC LIMIT 1""",
+                    (video_id,),
+                )
+                row = cursor.fetchone()
 
             if row:
-                return json.loads(row[0])
+                return _unpack(row[0])
             else:
                 logger.warning(f"No quiz found for video {video_id}")
                 return []
         except Exception as e:
             logger.error(f"Error retrieving quiz: {str(e)}")
             return []
-        finally:
-            conn.close()
 
     def list_videos(self) -> List[Dict]:
         """Get list of all videos."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
         try:
-            cursor.execute(
-                """SELECT v.video_id, v.title, v.uploaded_at, v.duration, v.thumbnail_path,
-                          s.summary
-                   FROM videos v
-                   LEFT JOIN summaries s ON v.video_id = s.video_id AND 
-                          s.created_at = (SELECT MAX(created_at) FROM summaries WHERE video_id = v.video_id)
-                   ORDER BY v.uploaded_at DESC"""
-            )
+            with self._pool.read() as cursor:
+                cursor.row_factory = sqlite3.Row
+                cursor.execute(
+                    """SELECT v.video_id, v.title, v.uploaded_at, v.duration, v.thumbnail_path,
+                              s.summary
+                       FROM videos v
+                       LEFT JOIN (
+                           SELECT s1.video_id, s1.summary
+                           FROM summaries s1
+                           JOIN (
+                               SELECT MAX(summary_id) AS summary_id
+                               FROM summaries GROUP BY video_id
+                           ) s2 ON s1.summary_id = s2.summary_id
+                       ) s ON s.video_id = v.video_id
+                       ORDER BY v.uploaded_at DESC"""
+                )
+                rows = cursor.fetchall()
 
             result = []
-            for row in cursor.fetchall():
+            for row in rows:
                 result.append(
                     {
                         "video_id": row["video_id"],
@@ -279,5 +643,3 @@ class VideoDatabase:
         except Exception as e:
             logger.error(f"Error listing videos: {str(e)}")
             return []
-        finally:
-            conn.close()
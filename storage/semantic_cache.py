@@ -0,0 +1,262 @@
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+import hnswlib
+import numpy as np
+
+from ..config import (
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL,
+    SEMANTIC_CACHE_PATH,
+    SEMANTIC_CACHE_MAX_ELEMENTS,
+)
+
+logger = logging.getLogger(__name__)
+
+# HNSW construction parameters and initial capacity of a namespace index
+_HNSW_M = 16
+_HNSW_EF_CONSTRUCTION = 200
+_INITIAL_CAPACITY = 1024
+# Neighbours checked per lookup, in case the nearest ones expired
+_LOOKUP_K = 4
+
+
+class _Namespace:
+    """HNSW index and cached completions for one (video_id, task) pair."""
+
+    def __init__(self, dim: int, version: int = 0, capacity: int = _INITIAL_CAPACITY):
+        self.index = hnswlib.Index(space="cosine", dim=dim)
+        self.index.init_index(
+            max_elements=capacity, ef_construction=_HNSW_EF_CONSTRUCTION, M=_HNSW_M
+        )
+        self.responses: Dict[int, str] = {}
+        self.expiry: Dict[int, float] = {}
+        self.next_label = 0
+        # Transcript version the completions were generated from
+        self.version = version
+
+
+class SemanticCache:
+    """Cache of LLM completions keyed on query embeddings.
+
+    Entries are namespaced by (video_id, task) so that answers for one video
+    are never served for another, and expire after ``ttl`` seconds. A namespace
+    also records the transcript version its answers came from and is dropped
+    once a newer one is seen, so re-processing a video invalidates it. Each
+    namespace is an HNSW index so lookups stay sub-linear as history grows.
+    """
+
+    def __init__(
+        self,
+        embedding_model,
+        ttl: int = SEMANTIC_CACHE_TTL,
+        path: Optional[str] = SEMANTIC_CACHE_PATH,
+        max_elements: int = SEMANTIC_CACHE_MAX_ELEMENTS,
+    ):
+        """
+        Initialize the SemanticCache.
+
+        Args:
+            embedding_model: Object exposing ``embed_query(text)``, normally the
+                VideoVectorStore so query embeddings are shared with search
+            ttl: Time to live of a cached completion in seconds
+            path: Directory the indexes are persisted to, None to keep them in memory only
+            max_elements: Maximum number of completions kept per namespace
+        """
+        self.embedding_model = embedding_model
+        self.ttl = ttl
+        self.path = path
+        self.max_elements = max_elements
+        self._namespaces: Dict[Tuple[str, str], _Namespace] = {}
+        self._lock = threading.Lock()
+
+        if path is not None:
+            self._load()
+            atexit.register(self.save)
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed a query and L2-normalize it so dot products are cosine similarities."""
+        embedding = np.asarray(self.embedding_model.embed_query(text), dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else embedding
+
+    def lookup(
+        self,
+        video_id: str,
+        embedding: np.ndarray,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        task: str = "qa",
+        version: int = 0,
+    ) -> Optional[str]:
+        """Return the cached completion most similar to ``embedding`` if above ``threshold``.
+
+        Only completions generated from transcript ``version`` of the video are served.
+        """
+        with self._lock:
+            namespace = self._namespaces.get((video_id, task))
+            if namespace is not None and namespace.version != version:
+                # Generated from another transcript of the video
+                del self._namespaces[(video_id, task)]
+                namespace = None
+            if namespace is None:
+                return None
+
+            now = time.time()
+            self._remove_expired(namespace, now)
+            if not namespace.responses:
+                return None
+
+            k = min(len(namespace.responses), _LOOKUP_K)
+            labels, distances = namespace.index.knn_query(embedding, k=k)
+            # Nearest first, skip entries that expired out of insertion order
+            for label, distance in zip(labels[0], distances[0]):
+                label = int(label)
+                similarity = 1.0 - float(distance)
+                if similarity < threshold:
+                    return None
+                if namespace.expiry[label] <= now:
+                    self._remove(namespace, label)
+                    continue
+
+                logger.debug(
+                    f"Semantic cache hit for video {video_id} ({task}), "
+                    f"similarity {similarity:.3f}"
+                )
+                return namespace.responses[label]
+            return None
+
+    def put(
+        self,
+        video_id: str,
+        embedding: np.ndarray,
+        response: str,
+        task: str = "qa",
+        version: int = 0,
+    ) -> None:
+        """Store a completion generated from transcript ``version`` for a query embedding."""
+        with self._lock:
+            namespace = self._namespaces.get((video_id, task))
+            if namespace is None or namespace.version != version:
+                namespace = _Namespace(dim=embedding.shape[0], version=version)
+                self._namespaces[(video_id, task)] = namespace
+
+            now = time.time()
+            self._remove_expired(namespace, now)
+            if len(namespace.responses) >= self.max_elements:
+                logger.debug(f"Semantic cache full for video {video_id} ({task})")
+                return
+
+            # hnswlib only marks deleted labels, grow the index when all slots are used
+            capacity = namespace.index.get_max_elements()
+            if namespace.index.get_current_count() >= capacity:
+                namespace.index.resize_index(capacity * 2)
+
+            label = namespace.next_label
+            namespace.next_label += 1
+            namespace.index.add_items(embedding[None, :], [label])
+            namespace.responses[label] = response
+            namespace.expiry[label] = now + self.ttl
+
+    @staticmethod
+    def _remove(namespace: _Namespace, label: int) -> None:
+        """Remove an entry from a namespace."""
+        namespace.index.mark_deleted(label)
+        del namespace.responses[label]
+        del namespace.expiry[label]
+
+    @classmethod
+    def _remove_expired(cls, namespace: _Namespace, now: float) -> None:
+        """Remove the expired entries at the front of a namespace.
+
+        Entries are inserted with the same TTL, so they expire in insertion order and
+        only the oldest ones need to be checked.
+        """
+        expired = []
+        for label, expiry in namespace.expiry.items():
+            if expiry > now:
+                break
+            expired.append(label)
+        for label in expired:
+            cls._remove(namespace, label)
+
+    def clear(self) -> None:
+        """Clear all cached completions."""
+        with self._lock:
+            self._namespaces.clear()
+        logger.info("Semantic cache cleared")
+
+    def save(self) -> None:
+        """Persist all namespaces to ``self.path``."""
+        if self.path is None:
+            return
+
+        os.makedirs(self.path, exist_ok=True)
+        manifest = []
+        with self._lock:
+            for i, ((video_id, task), namespace) in enumerate(self._namespaces.items()):
+                index_file = f"{i}.bin"
+                namespace.index.save_index(os.path.join(self.path, index_file))
+                manifest.append(
+                    {
+                        "video_id": video_id,
+                        "task": task,
+                        "index_file": index_file,
+                        "dim": namespace.index.dim,
+                        "next_label": namespace.next_label,
+                        "version": namespace.version,
+                        "entries": [
+                            [label, response, namespace.expiry[label]]
+                            for label, response in namespace.responses.items()
+                        ],
+                    }
+                )
+
+        with open(os.path.join(self.path, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+        logger.info(f"Saved semantic cache with {len(manifest)} namespaces to {self.path}")
+
+    def _load(self) -> None:
+        """Load namespaces persisted by save(), dropping expired entries."""
+        manifest_path = os.path.join(self.path, "manifest.json")
+        if not os.path.exists(manifest_path):
+            return
+
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+
+            now = time.time()
+            for item in manifest:
+                namespace = _Namespace.__new__(_Namespace)
+                namespace.index = hnswlib.Index(space="cosine", dim=item["dim"])
+                namespace.index.load_index(os.path.join(self.path, item["index_file"]))
+                namespace.responses = {}
+                namespace.expiry = {}
+                namespace.next_label = item["next_label"]
+                namespace.version = item.get("version", 0)
+
+                # Everything saved but not listed (or expired) is unreachable
+                live_labels = set()
+                for label, response, expiry in item["entries"]:
+                    if expiry > now:
+                        namespace.responses[label] = response
+                        namespace.expiry[label] = expiry
+                        live_labels.add(label)
+                for label in namespace.index.get_ids_list():
+                    if label not in live_labels:
+                        try:
+                            namespace.index.mark_deleted(label)
+                        except RuntimeError:
+                            pass  # already marked deleted before saving
+
+                self._namespaces[(item["video_id"], item["task"])] = namespace
+
+            logger.info(f"Loaded semantic cache with {len(manifest)} namespaces from {self.path}")
+        except Exception as e:
+            logger.warning(f"Could not load semantic cache from {self.path}: {str(e)}")
+            self._namespaces.clear()
@@ -1,22 +1,33 @@
 import os
+import heapq
 import logging
+import threading
+from functools import lru_cache
 from typing import Dict, List, Optional
+
+import chromadb
+import numpy as np
 from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
-from ..config import VECTOR_DB_PATH
+from ..config import VECTOR_DB_PATH, ensure_dirs
+from .embeddings import QuantizedEmbeddings
 
 logger = logging.getLogger(__name__)
 
+_VIDEO_COLLECTION_PREFIX = "video_"
+
 
 class VideoVectorStore:
     def __init__(self, vector_db_path: str = VECTOR_DB_PATH):
         """Initialize vector store for semantic search of transcript segments."""
         self.vector_db_path = vector_db_path
-        self.embedding_model = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2", model_kwargs={"device": "cpu"}
+        ensure_dirs()
+        self.embedding_model = QuantizedEmbeddings(
+            model_name="sentence-transformers/all-MiniLM-L6-v2", device="cpu"
         )
+        # Query embeddings are a pure function of the text, memoize them per instance
+        self._embed = lru_cache(maxsize=2048)(self._embed_uncached)
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=500, chunk_overlap=50, separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""]
         )
@@ -24,61 +35,157 @@ class VideoVectorStore:
         # Create directory if it doesn't exist
         os.makedirs(vector_db_path, exist_ok=True)
 
-        # Try to load existing DB, or create a new one
+        # One client for every collection, Chroma would otherwise open the directory per store
+        self.client = chromadb.PersistentClient(path=vector_db_path)
+
+        # Try to load existing DB, or create a new one. The shared collection holds videos
+        # ingested before each video got its own collection
         try:
-            self.db = Chroma(
-                persist_directory=vector_db_path, embedding_function=self.embedding_model
-            )
+            self.db = Chroma(client=self.client, embedding_function=self.embedding_model)
             logger.info(f"Loaded vector store from {vector_db_path}")
         except Exception as e:
             logger.warning(f"Could not load existing vector store: {str(e)}")
             logger.info("Creating new vector store")
-            self.db = Chroma(
-                persist_directory=vector_db_path, embedding_function=self.embedding_model
+            self.db = Chroma(client=self.client, embedding_function=self.embedding_model)
+
+        # video_id -> Chroma store over that video's own collection
+        self._video_stores: Dict[str, Chroma] = {}
+        self._video_stores_lock = threading.Lock()
+
+    @staticmethod
+    def _collection_name(video_id: str) -> str:
+        """Name of the Chroma collection holding a video's segments."""
+        return f"{_VIDEO_COLLECTION_PREFIX}{video_id}"
+
+    def _video_store(self, video_id: str) -> Optional[Chroma]:
+        """Get the store over a video's collection, None if the video has none."""
+        with self._video_stores_lock:
+            store = self._video_stores.get(video_id)
+            if store is not None:
+                return store
+
+            try:
+                self.client.get_collection(self._collection_name(video_id))
+            except Exception:
+                return None
+
+            store = Chroma(
+                client=self.client,
+                collection_name=self._collection_name(video_id),
+                embedding_function=self.embedding_model,
             )
+            self._video_stores[video_id] = store
+            return store
+
+    def _all_video_stores(self) -> Dict[str, Chroma]:
+        """Get the stores of all per-video collections, by video_id."""
+        stores = {}
+        for collection in self.client.list_collections():
+            # chromadb >= 0.6 lists names, older versions Collection objects
+            name = getattr(collection, "name", collection)
+            if name.startswith(_VIDEO_COLLECTION_PREFIX):
+                video_id = name[len(_VIDEO_COLLECTION_PREFIX) :]
+                store = self._video_store(video_id)
+                if store is not None:
+                    stores[video_id] = store
+        return stores
 
     def add_transcript(self, video_id: str, transcript: str, segments: List[Dict]) -> None:
         """Add transcript segments to vector store."""
         try:
-            # Create documents from segments
-            documents = []
+            # Split long segments, each chunk keeps the metadata of its segment
+            texts, metadatas = [], []
             for i, segment in enumerate(segments):
-                text = segment["text"]
                 metadata = {
                     "video_id": video_id,
                     "segment_id": i,
                     "start_time": segment["start"],
                     "end_time": segment["end"],
                 }
-                documents.append((text, metadata))
-
-            # Split long documents if needed
-            processed_docs = []
-            for text, metadata in documents:
-                chunks = self.text_splitter.split_text(text)
-                for chunk in chunks:
-                    processed_docs.append({"page_content": chunk, "metadata": metadata})
-
-            # Add to vector store with video_id as collection name
-            self.db.add_documents(processed_docs)
-            self.db.persist()
-            logger.info(
-                f"Added {len(processed_docs)} segments to vector store for video {video_id}"
+                for chunk in self.text_splitter.split_text(segment["text"]):
+                    texts.append(chunk)
+                    metadatas.append(metadata)
+
+            if not texts:
+                logger.info(f"No segments to add to vector store for video {video_id}")
+                return
+
+            # Embed all chunks in one batched forward pass and write them in one call,
+            # Chroma persists on write so no explicit persist() is needed
+            embeddings = self.embedding_model.embed_documents(texts)
+
+            # Re-ingesting replaces the video's collection, so no stale chunks are left behind
+            name = self._collection_name(video_id)
+            with self._video_stores_lock:
+                self._video_stores.pop(video_id, None)
+                try:
+                    self.client.delete_collection(name)
+                except Exception:
+                    pass  # first ingestion of this video
+                collection = self.client.create_collection(name)
+
+            collection.add(
+                ids=[f"{video_id}:{i}" for i in range(len(texts))],
+                embeddings=embeddings,
+                documents=texts,
+                metadatas=metadatas,
             )
+
+            # Chunks of a legacy ingestion in the shared collection are superseded
+            legacy_ids = self.db.get(where={"video_id": video_id}, include=[])["ids"]
+            if legacy_ids:
+                self.db.delete(ids=legacy_ids)
+
+            logger.info(f"Added {len(texts)} segments to vector store for video {video_id}")
         except Exception as e:
             logger.error(f"Error adding transcript to vector store: {str(e)}")
             raise
 
+    def _embed_uncached(self, text: str) -> np.ndarray:
+        """Embed a query string with the sentence-transformer model."""
+        embedding = np.asarray(self.embedding_model.embed_query(text), dtype=np.float32)
+        embedding.flags.writeable = False
+        return embedding
+
+    def embed_query(self, text: str) -> np.ndarray:
+        """Return the (memoized) embedding of a query string."""
+        return self._embed(text)
+
     def search(self, query: str, video_id: Optional[str] = None, k: int = 5) -> List[Dict]:
         """Search for relevant transcript segments using semantic search."""
         try:
-            # Prepare filter if video_id is provided
-            filter_dict = None
-            if video_id:
-                filter_dict = {"video_id": video_id}
+            embedding = self.embed_query(query).tolist()
 
-            # Perform search
-            results = self.db.similarity_search_with_score(query=query, k=k, filter=filter_dict)
+            if video_id:
+                store = self._video_store(video_id)
+                if store is not None:
+                    # The video's own index, no metadata filter over the whole library
+                    results = store.similarity_search_by_vector_with_relevance_scores(
+                        embedding=embedding, k=k
+                    )
+                else:
+                    results = self.db.similarity_search_by_vector_with_relevance_scores(
+                        embedding=embedding, k=k, filter={"video_id": video_id}
+                    )
+            else:
+                # Top k of every collection, merged by distance (lower is closer)
+                video_stores = self._all_video_stores()
+                # Videos ingested again into their own collection may still have stale
+                # chunks in the shared one
+                results = [
+                    result
+                    for result in self.db.similarity_search_by_vector_with_relevance_scores(
+                        embedding=embedding, k=k
+                    )
+                    if result[0].metadata["video_id"] not in video_stores
+                ]
+                for store in video_stores.values():
+                    results.extend(
+                        store.similarity_search_by_vector_with_relevance_scores(
+                            embedding=embedding, k=k
+                        )
+                    )
+                results = heapq.nsmallest(k, results, key=lambda result: result[1])
 
             # Format results
             processed_results = []
@@ -1,21 +1,52 @@
+import math
 import torch
 import librosa
+import soundfile as sf
+import torchaudio.functional as AF
+from collections import Counter
+from functools import lru_cache
 from typing import List, Dict
 from nltk.translate.bleu_score import sentence_bleu, SmoothingFunction
 from transformers import WhisperForConditionalGeneration, WhisperProcessor
 from jiwer import wer, mer, wil, cer
 
+try:
+    from sacrebleu.metrics import BLEU
+except ImportError:  # sacrebleu is optional, fall back to nltk
+    BLEU = None
+
+
+def load_audio(audio_path, device, target_sr=16000):
+    """
+    Load audio as a mono float32 array at target_sr, resampling on device
+    """
+    try:
+        # libsndfile decodes in C, much faster than librosa's audioread path
+        wav, sr = sf.read(audio_path, dtype="float32", always_2d=False)
+    except Exception:
+        # Formats libsndfile can't read
+        audio_array, _ = librosa.load(audio_path, sr=target_sr)
+        return audio_array
+
+    if wav.ndim > 1:
+        wav = wav.mean(axis=1)
+    if sr == target_sr:
+        return wav
+
+    wav_t = AF.resample(torch.from_numpy(wav).to(device), sr, target_sr)
+    return wav_t.cpu().numpy()
+
 
 def transcribe_audio(model, processor, audio_path, device):
     """
     Transcribe mp3 audio using the loaded Whisper model
     """
     try:
-        audio_array, sampling_rate = librosa.load(audio_path, sr=16000)
+        audio_array = load_audio(audio_path, device)
 
         input_features = processor.feature_extractor(
             audio_array, sampling_rate=16000, return_tensors="pt"
-        ).input_features.to(device)
+        ).input_features.to(device, dtype=model.dtype)
 
         with torch.no_grad():
             predicted_ids = model.generate(input_features)
@@ -27,19 +58,26 @@ def transcribe_audio(model, processor, audio_path, device):
         return ""
 
 
+@lru_cache(maxsize=8)
 def load_whisper_model(model_size):
     """
-    Load a Whisper model of the specified size
+    Load a Whisper model of the specified size, reusing it on repeated calls.
+
+    The returned model and processor are shared, do not modify them.
     """
     model_name = f"openai/whisper-{model_size}"
     processor = WhisperProcessor.from_pretrained(
         model_name, cache_dir="/global/lynx_arm_esa/user/amisingh/temp"
     )
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    # Half precision on GPU, CPUs have no fast FP16 path
     model = WhisperForConditionalGeneration.from_pretrained(
-        model_name, cache_dir="/global/lynx_arm_esa/user/amisingh/temp"
+        model_name,
+        cache_dir="/global/lynx_arm_esa/user/amisingh/temp",
+        torch_dtype=torch.float16 if device == "cuda" else torch.float32,
     )
-
-    device = "cuda" if torch.cuda.is_available() else "cpu"
+    if device == "cuda":
+        torch.backends.cuda.matmul.allow_tf32 = True
     model = model.to(device)
 
     return model, processor, device
@@ -65,24 +103,39 @@ def calculate_metrics(predictions: List[str], references: List[str]) -> Dict[str
     metrics["cer"] = cer(references, predictions)
 
     try:
-        ref_tokens = [ref.split() for ref in references]
-        pred_tokens = [pred.split() for pred in predictions]
-
-        weights = [
-            (1.0, 0, 0, 0),  # BLEU-1
-            (0.5, 0.5, 0, 0),  # BLEU-2
-            (0.33, 0.33, 0.34, 0),  # BLEU-3
-            (0.25, 0.25, 0.25, 0.25),
-        ]  # BLEU-4
-
-        smoothing = SmoothingFunction().method1
-        for i, weight in enumerate(weights, 1):
-            metrics[f"bleu_{i}"] = sentence_bleu(
-                ref_tokens,  # All references for this prediction
-                pred_tokens[0],
-                weights=weight,
-                smoothing_function=smoothing,
+        if BLEU is not None:
+            # n-gram statistics are counted once, BLEU-1..4 are derived from them. Like the
+            # nltk path, the first prediction is scored against all references
+            score = BLEU(smooth_method="floor").corpus_score(
+                predictions[:1], [[ref] for ref in references]
             )
+            for i in range(1, 5):
+                precisions = score.precisions[:i]
+                # A hypothesis shorter than i tokens has no i-grams and a zero precision
+                if min(precisions) > 0:
+                    log_mean = sum(math.log(p / 100) for p in precisions) / i
+                    metrics[f"bleu_{i}"] = score.bp * math.exp(log_mean)
+                else:
+                    metrics[f"bleu_{i}"] = 0.0
+        else:
+            ref_tokens = [ref.split() for ref in references]
+            pred_tokens = [pred.split() for pred in predictions]
+
+            weights = [
+                (1.0, 0, 0, 0),  # BLEU-1
+                (0.5, 0.5, 0, 0),  # BLEU-2
+                (0.33, 0.33, 0.34, 0),  # BLEU-3
+                (0.25, 0.25, 0.25, 0.25),
+            ]  # BLEU-4
+
+            smoothing = SmoothingFunction().method1
+            for i, weight in enumerate(weights, 1):
+                metrics[f"bleu_{i}"] = sentence_bleu(
+                    ref_tokens,  # All references for this prediction
+                    pred_tokens[0],
+                    weights=weight,
+                    smoothing_function=smoothing,
+                )
 
         metrics["bleu"] = metrics["bleu_4"]
 
@@ -93,21 +146,16 @@ def calculate_metrics(predictions: List[str], references: List[str]) -> Dict[str
             metrics[f"bleu_{i}"] = 0.0
 
     try:
-        ref_tokens_flat = []
-        pred_tokens_flat = []
-
-        for ref in references:
-            ref_tokens_flat.extend(ref.lower().split())
-        for pred in predictions:
-            pred_tokens_flat.extend(pred.lower().split())
-
-        ref_set = set(ref_tokens_flat)
-        pred_set = set(pred_tokens_flat)
+        # Multiset counts, a word matches as many times as it occurs on both sides
+        ref_counts = Counter(word for ref in references for word in ref.lower().split())
+        pred_counts = Counter(word for pred in predictions for word in pred.lower().split())
 
-        true_positives = len(ref_set.intersection(pred_set))
+        true_positives = sum((ref_counts & pred_counts).values())
+        pred_total = sum(pred_counts.values())
+        ref_total = sum(ref_counts.values())
 
-        precision = true_positives / len(pred_set) if pred_set else 0.0
-        recall = true_positives / len(ref_set) if ref_set else 0.0
+        precision = true_positives / pred_total if pred_total else 0.0
+        recall = true_positives / ref_total if ref_total else 0.0
         f1 = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0.0
 
         metrics["precision"] = precision
@@ -116,8 +164,8 @@ def calculate_metrics(predictions: List[str], references: List[str]) -> Dict[str
 
         # Additional metrics
         metrics["true_positives"] = true_positives
-        metrics["false_positives"] = len(pred_set - ref_set)
-        metrics["false_negatives"] = len(ref_set - pred_set)
+        metrics["false_positives"] = pred_total - true_positives
+        metrics["false_negatives"] = ref_total - true_positives
 
     except Exception as e:
         print(f"F1 calculation failed: {e}")
@@ -1,9 +1,15 @@
 import re
+from functools import lru_cache
 from typing import Dict, List, Tuple
 import logging
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# HH:MM:SS or MM:SS
+_TS_RE = re.compile(r"(\d{1,2}):(\d{2})(?::(\d{2}))?")
+
 
 class TimestampParser:
     """Parser for handling and searching through timestamped transcripts."""
@@ -11,11 +17,31 @@ class TimestampParser:
     @staticmethod
     def format_timestamp(seconds: float) -> str:
         """Convert seconds to HH:MM:SS format."""
-        hours, remainder = divmod(int(seconds), 3600)
+        # Truncate before the lookup so float positions share whole-second entries
+        return TimestampParser._format_seconds(int(seconds))
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _format_seconds(seconds: int) -> str:
+        """Memoized implementation of format_timestamp."""
+        hours, remainder = divmod(seconds, 3600)
         minutes, seconds = divmod(remainder, 60)
         return f"{hours:02}:{minutes:02}:{seconds:02}"
 
     @staticmethod
+    def format_timestamps_bulk(starts: np.ndarray) -> List[str]:
+        """Convert an array of seconds to HH:MM:SS strings in one vectorized pass."""
+        starts = np.asarray(starts).astype(np.int64)
+        hours = starts // 3600
+        minutes = (starts % 3600) // 60
+        seconds = starts % 60
+        return [
+            f"{hh:02}:{mm:02}:{ss:02}"
+            for hh, mm, ss in zip(hours.tolist(), minutes.tolist(), seconds.tolist())
+        ]
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
     def parse_timestamp(timestamp_str: str) -> float:
         """Convert HH:MM:SS format to seconds."""
         try:
@@ -36,21 +62,23 @@ class TimestampParser:
     @staticmethod
     def find_text_in_segments(segments: List[Dict], query: str) -> List[Dict]:
         """Find segments containing the query text."""
-        results = []
+        # A single scan, building a storage Transcript buffer for one search costs the same
         query = query.lower()
-
-        for segment in segments:
-            if query in segment["text"].lower():
-                results.append(
-                    {
-                        "start": segment["start"],
-                        "end": segment["end"],
-                        "text": segment["text"],
-                        "timestamp": TimestampParser.format_timestamp(segment["start"]),
-                    }
-                )
-
-        return results
+        matches = [
+            index for index, segment in enumerate(segments) if query in segment["text"].lower()
+        ]
+        timestamps = TimestampParser.format_timestamps_bulk(
+            np.array([segments[index]["start"] for index in matches], dtype=np.float64)
+        )
+        return [
+            {
+                "start": segments[index]["start"],
+                "end": segments[index]["end"],
+                "text": segments[index]["text"],
+                "timestamp": timestamp,
+            }
+            for index, timestamp in zip(matches, timestamps)
+        ]
 
     @staticmethod
     def segment_to_navigation_point(segment: Dict) -> Dict:
@@ -64,14 +92,21 @@ class TimestampParser:
     @staticmethod
     def extract_timestamps_from_text(text: str) -> List[Tuple[str, float]]:
         """Extract timestamps mentioned in text (like "at 5:30" or "around 1:20:15")."""
-        # Match HH:MM:SS or MM:SS patterns
-        timestamp_pattern = r"(\d{1,2}):(\d{2})(?::(\d{2}))?"
-        matches = re.finditer(timestamp_pattern, text)
+        # Copy so callers can't mutate the memoized result
+        return list(TimestampParser._extract_timestamps(text))
 
+    @staticmethod
+    @lru_cache(maxsize=2048)
+    def _extract_timestamps(text: str) -> Tuple[Tuple[str, float], ...]:
+        """Memoized implementation of extract_timestamps_from_text, queries repeat often."""
         results = []
-        for match in matches:
-            ts_str = match.group(0)
-            ts_seconds = TimestampParser.parse_timestamp(ts_str)
-            results.append((ts_str, ts_seconds))
+        for match in _TS_RE.finditer(text):
+            first, second, third = match.groups()
+            # The groups are already digits, no need to re-split the matched string
+            if third is None:  # MM:SS
+                ts_seconds = int(first) * 60 + int(second)
+            else:  # HH:MM:SS
+                ts_seconds = int(first) * 3600 + int(second) * 60 + int(third)
+            results.append((match.group(0), ts_seconds))
 
-        return results
+        return tuple(results)